@@ -0,0 +1,50 @@
+# cython: language_level=3
+"""
+Compiled substring scan used by core.keyword_scan when Hyperscan is unavailable.
+
+Build in place with ``cythonize -i app/core/_keyword_scan.pyx``; without the built
+extension the scanner silently uses its other backends.
+"""
+
+from libc.string cimport strstr
+
+
+cpdef int scan(bytes text, list keywords):
+    """
+    Find the first keyword, in list order, that occurs in ``text``.
+
+    Args:
+        text: Lowercased, UTF-8 encoded text (scanned up to its first NUL byte)
+        keywords: Lowercased, UTF-8 encoded keywords in priority order
+
+    Returns:
+        Lowest index in ``keywords`` of a keyword that occurs, or -1 if none occurs
+    """
+    cdef const char* haystack = text
+    cdef Py_ssize_t i
+
+    for i in range(len(keywords)):
+        if strstr(haystack, <const char*><bytes>keywords[i]) != NULL:
+            return <int>i
+    return -1
+
+
+cpdef list scan_all(bytes text, list keywords):
+    """
+    Find every keyword that occurs in ``text``.
+
+    Args:
+        text: Lowercased, UTF-8 encoded text (scanned up to its first NUL byte)
+        keywords: Lowercased, UTF-8 encoded keywords
+
+    Returns:
+        Indices of the matched keywords, in keyword order
+    """
+    cdef const char* haystack = text
+    cdef Py_ssize_t i
+    cdef list found = []
+
+    for i in range(len(keywords)):
+        if strstr(haystack, <const char*><bytes>keywords[i]) != NULL:
+            found.append(i)
+    return found
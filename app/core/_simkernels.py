@@ -0,0 +1,49 @@
+"""
+Compiled Similarity Kernels
+
+Numba-compiled scoring loops used by core.embedding_index when numba is installed.
+Compiled code is cached next to this module (``cache=True``), so the JIT cost is only
+paid on the first run; without numba the index uses its NumPy implementation.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # optional accelerator
+    njit = None
+
+
+if njit is not None:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def int8_score_matrix(codes, query_codes, scales, query_scales):
+        """
+        Score int8-quantized embeddings against a batch of quantized queries.
+
+        Rows of the index are split across threads and each row is scored against
+        every query while it is in cache, so the codes are read once per batch.
+
+        Args:
+            codes: int8 codes of the indexed embeddings, shape (n, dim)
+            query_codes: int8 codes of the queries, shape (q, dim)
+            scales: float32 per-vector scales of the indexed embeddings, shape (n,)
+            query_scales: float32 per-vector scales of the queries, shape (q,)
+
+        Returns:
+            float32 cosine similarities, shape (q, n)
+        """
+        n, dim = codes.shape
+        q = query_codes.shape[0]
+        scores = np.empty((q, n), dtype=np.float32)
+        for i in prange(n):
+            for k in range(q):
+                acc = np.int32(0)
+                for j in range(dim):
+                    acc += np.int32(codes[i, j]) * np.int32(query_codes[k, j])
+                # Cast before scaling so the product stays in float32 rather than float64
+                scores[k, i] = np.float32(acc) * scales[i] * query_scales[k]
+        return scores
+
+else:
+    int8_score_matrix = None
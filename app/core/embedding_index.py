@@ -0,0 +1,402 @@
+"""
+In-Process Embedding Indexes
+
+This module provides in-process nearest-neighbour indexes that mirror the embeddings
+stored in ChromaDB. ChromaDB remains the durable store for memories; searches run
+against the mirror and only fetch metadata of the hits from ChromaDB.
+
+Two interchangeable indexes are available:
+- Int8EmbeddingIndex: exact search over int8 scalar-quantized embeddings, scanning
+  1 byte per dimension instead of 4 (no extra dependencies)
+- HnswEmbeddingIndex: approximate HNSW graph search in C++ via hnswlib (optional)
+
+Use :func:`create_embedding_index` to get the best available one. Either index can
+be saved next to the datastore and reloaded with :func:`load_embedding_index`, so a
+restart does not rebuild it from every stored embedding. When numba is
+installed the int8 scan runs as a parallel compiled kernel from ``core._simkernels``.
+
+Each vector is normalized and quantized with its own scale (``max(|v|) / 127``), so
+the cosine similarity of two vectors is recovered as the int32 dot product of their
+codes times both scales. With 384-dimensional MiniLM embeddings the ranking error is
+far below the gap between relevant and unrelated memories, and the few best
+candidates are re-scored against float16 copies to remove it from the results.
+"""
+
+import logging
+import os
+import pickle
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core._simkernels import int8_score_matrix
+
+try:
+    import hnswlib
+except ImportError:  # optional accelerator, falls back to the exact int8 index
+    hnswlib = None
+
+
+# The int8 index re-scores this many candidates per requested result exactly
+RERANK_FACTOR = 4
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scale vectors to unit length, leaving zero vectors unchanged.
+
+    Args:
+        vectors: Float array of shape (n, dim)
+
+    Returns:
+        float32 array of shape (n, dim)
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def quantize(vectors: np.ndarray, normalized: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Normalize vectors and scalar-quantize them to int8 with a per-vector scale.
+
+    Args:
+        vectors: Float array of shape (n, dim)
+        normalized: Whether the vectors already have unit length
+
+    Returns:
+        Tuple of (int8 codes of shape (n, dim), float32 scales of shape (n,))
+    """
+    vectors = vectors if normalized else normalize(vectors)
+    peaks = np.abs(vectors).max(axis=1)
+    scales = np.where(peaks > 0, peaks / 127.0, 1.0).astype(np.float32)
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales
+
+
+class _PersistentIndex:
+    """Pickle-based persistence shared by the indexes; subclasses own ``_lock``."""
+
+    # Bumped when the pickled attributes change, so older saved indexes are rebuilt
+    STATE_VERSION = 1
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def save(self, path: str, meta: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Persist the index and its memory IDs to a single file.
+
+        Arrays and graphs are pickled in binary form (protocol 5), so loading is one
+        read rather than parsing a float list per memory. The file is replaced
+        atomically, so processes sharing the datastore never load a partially written
+        index.
+
+        Args:
+            path: Destination file path
+            meta: Extra values to store with the index (e.g. the caller's watermark)
+        """
+        with self._lock:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({"index": self, "meta": meta or {}, "version": self.STATE_VERSION},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+
+
+class Int8EmbeddingIndex(_PersistentIndex):
+    """
+    Exact cosine-similarity index over int8-quantized embeddings.
+
+    The scan runs over the int8 codes; the best ``RERANK_FACTOR * k`` candidates
+    are then re-scored against float16 copies of the normalized embeddings, so the
+    returned order and similarities carry no quantization error.
+
+    Attributes:
+        ids (List[str]): Memory IDs in row order
+    """
+
+    STATE_VERSION = 2
+
+    def __init__(self):
+        """Create an empty index; the dimension is fixed by the first added vectors."""
+        self.ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._codes: np.ndarray = np.empty((0, 0), dtype=np.int8)
+        self._scales: np.ndarray = np.empty(0, dtype=np.float32)
+        self._vectors: np.ndarray = np.empty((0, 0), dtype=np.float16)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, memory_id: str) -> bool:
+        return memory_id in self._positions
+
+    def add(self, ids: Sequence[str], embeddings: Sequence[Sequence[float]]) -> int:
+        """
+        Add embeddings to the index, skipping IDs that are already indexed.
+
+        Args:
+            ids: Memory IDs of the embeddings
+            embeddings: Embedding vectors in the same order as ``ids``
+
+        Returns:
+            Number of embeddings added
+        """
+        with self._lock:
+            fresh = [i for i, memory_id in enumerate(ids) if memory_id not in self._positions]
+            if not fresh:
+                return 0
+
+            vectors = normalize(np.asarray(embeddings, dtype=np.float32)[fresh])
+            codes, scales = quantize(vectors, normalized=True)
+            start, end = len(self.ids), len(self.ids) + len(fresh)
+            self._reserve(end, vectors.shape[1])
+            self._codes[start:end] = codes
+            self._scales[start:end] = scales
+            self._vectors[start:end] = vectors
+            for i in fresh:
+                self._positions[ids[i]] = len(self.ids)
+                self.ids.append(ids[i])
+            return len(fresh)
+
+    def _reserve(self, needed: int, dim: int) -> None:
+        # Rows live in preallocated buffers that double when full, so adding one
+        # memory at a time does not copy the whole index on each add
+        capacity = len(self._scales)
+        if needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity, 64)
+        size = len(self.ids)
+        for name, dtype, shape in (('_codes', np.int8, (capacity, dim)),
+                                   ('_scales', np.float32, (capacity,)),
+                                   ('_vectors', np.float16, (capacity, dim))):
+            grown = np.empty(shape, dtype=dtype)
+            if size:
+                grown[:size] = getattr(self, name)[:size]
+            setattr(self, name, grown)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only the used rows are saved
+        state = super().__getstate__()
+        size = len(self.ids)
+        for name in ('_codes', '_scales', '_vectors'):
+            state[name] = state[name][:size]
+        return state
+
+    def search(self, query: Sequence[float], k: int) -> List[Tuple[str, float]]:
+        """
+        Find the indexed embeddings most similar to a query.
+
+        Args:
+            query: Query embedding
+            k: Maximum number of results
+
+        Returns:
+            List of (memory ID, cosine similarity) pairs, most similar first
+        """
+        return self.search_batch([query], k)[0]
+
+    def search_batch(self, queries: Sequence[Sequence[float]], k: int) -> List[List[Tuple[str, float]]]:
+        """
+        Find the indexed embeddings most similar to each of several queries.
+
+        All queries are scored in one pass over the codes, so the index is read
+        once per batch rather than once per query.
+
+        Args:
+            queries: Query embeddings
+            k: Maximum number of results per query
+
+        Returns:
+            One list of (memory ID, cosine similarity) pairs per query, most similar first
+        """
+        with self._lock:
+            if not self.ids or k <= 0 or not len(queries):
+                return [[] for _ in queries]
+            query_vectors = normalize(np.asarray(queries, dtype=np.float32))
+            query_codes, query_scales = quantize(query_vectors, normalized=True)
+            size = len(self.ids)
+            codes, scales = self._codes[:size], self._scales[:size]
+            if int8_score_matrix is not None:
+                scores = int8_score_matrix(codes, query_codes, scales, query_scales)
+            else:
+                # int8 codes are widened to int32 inside einsum's buffered loop, not copied up front
+                dots = np.einsum('qj,ij->qi', query_codes, codes, dtype=np.int32)
+                # int32 * float32 would promote to float64; rescale in float32, in place
+                scores = dots.astype(np.float32)
+                scores *= query_scales[:, None]
+                scores *= scales
+            return [self._rerank(row, query, k) for row, query in zip(scores, query_vectors)]
+
+    def _rerank(self, scores: np.ndarray, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        # Partition out the best candidates, then order them by their exact similarity
+        candidates = min(len(scores), RERANK_FACTOR * k)
+        if candidates < len(scores):
+            top = np.argpartition(-scores, candidates - 1)[:candidates]
+        else:
+            top = np.arange(len(scores))
+        exact = self._vectors[top].astype(np.float32) @ query
+        order = np.argsort(-exact)[:k]
+        return [(self.ids[top[i]], float(exact[i])) for i in order]
+
+
+class HnswEmbeddingIndex(_PersistentIndex):
+    """
+    Approximate cosine-similarity index backed by an hnswlib HNSW graph.
+
+    The graph grows automatically (doubling its capacity) as embeddings are added.
+
+    Attributes:
+        ids (List[str]): Memory IDs in label order
+    """
+
+    def __init__(self, capacity: int = 1024, ef_construction: int = 200, M: int = 16, ef: int = 64):
+        """
+        Create an empty index; the dimension is fixed by the first added vectors.
+
+        Args:
+            capacity: Initial number of elements the graph can hold
+            ef_construction: Candidate list size while building the graph
+            M: Number of graph links per element
+            ef: Candidate list size while searching (raised to ``k`` when needed)
+        """
+        self.ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._graph = None
+        self._capacity = capacity
+        self._ef_construction = ef_construction
+        self._M = M
+        self._ef = ef
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, memory_id: str) -> bool:
+        return memory_id in self._positions
+
+    def add(self, ids: Sequence[str], embeddings: Sequence[Sequence[float]]) -> int:
+        """
+        Add embeddings to the index, skipping IDs that are already indexed.
+
+        Args:
+            ids: Memory IDs of the embeddings
+            embeddings: Embedding vectors in the same order as ``ids``
+
+        Returns:
+            Number of embeddings added
+        """
+        with self._lock:
+            fresh = [i for i, memory_id in enumerate(ids) if memory_id not in self._positions]
+            if not fresh:
+                return 0
+
+            vectors = np.asarray(embeddings, dtype=np.float32)[fresh]
+            if self._graph is None:
+                self._graph = hnswlib.Index(space='cosine', dim=vectors.shape[1])
+                self._graph.init_index(max_elements=max(self._capacity, len(fresh)),
+                                       ef_construction=self._ef_construction, M=self._M)
+
+            needed = len(self.ids) + len(fresh)
+            if needed > self._graph.get_max_elements():
+                self._graph.resize_index(max(needed, 2 * self._graph.get_max_elements()))
+
+            labels = np.arange(len(self.ids), needed)
+            self._graph.add_items(vectors, labels)
+            for i in fresh:
+                self._positions[ids[i]] = len(self.ids)
+                self.ids.append(ids[i])
+            return len(fresh)
+
+    def search(self, query: Sequence[float], k: int) -> List[Tuple[str, float]]:
+        """
+        Find the indexed embeddings most similar to a query.
+
+        Args:
+            query: Query embedding
+            k: Maximum number of results
+
+        Returns:
+            List of (memory ID, cosine similarity) pairs, most similar first
+        """
+        return self.search_batch([query], k)[0]
+
+    def search_batch(self, queries: Sequence[Sequence[float]], k: int) -> List[List[Tuple[str, float]]]:
+        """
+        Find the indexed embeddings most similar to each of several queries.
+
+        hnswlib searches the queries of one call on its own thread pool.
+
+        Args:
+            queries: Query embeddings
+            k: Maximum number of results per query
+
+        Returns:
+            One list of (memory ID, cosine similarity) pairs per query, most similar first
+        """
+        with self._lock:
+            k = min(k, len(self.ids))
+            if k <= 0 or not len(queries):
+                return [[] for _ in queries]
+            self._graph.set_ef(max(self._ef, k))
+            labels, distances = self._graph.knn_query(np.asarray(queries, dtype=np.float32), k=k)
+            # hnswlib's cosine space reports 1 - cosine similarity
+            return [
+                [(self.ids[label], 1.0 - float(distance)) for label, distance in zip(row_labels, row_distances)]
+                for row_labels, row_distances in zip(labels, distances)
+            ]
+
+
+
+EmbeddingIndex = Union[Int8EmbeddingIndex, HnswEmbeddingIndex]
+
+
+def _use_hnsw() -> bool:
+    return hnswlib is not None and os.getenv("MEMORY_INDEX", "hnsw") != "exact"
+
+
+def create_embedding_index() -> EmbeddingIndex:
+    """
+    Create the best available embedding index.
+
+    Returns the HNSW index when hnswlib is installed, otherwise the exact int8 index.
+    Set ``MEMORY_INDEX=exact`` to always use the exact index.
+    """
+    if _use_hnsw():
+        return HnswEmbeddingIndex()
+    return Int8EmbeddingIndex()
+
+
+def load_embedding_index(path: str) -> Optional[Tuple[EmbeddingIndex, Dict[str, Any]]]:
+    """
+    Load an index saved with ``save``.
+
+    Args:
+        path: File the index was saved to
+
+    Returns:
+        Tuple of (index, saved meta), or None if the file is missing, unreadable, or
+        holds a different kind or older layout of index than :func:`create_embedding_index`
+        would create
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            saved = pickle.load(f)
+    except Exception as e:
+        logging.warning(f"Could not load saved embedding index from {path}: {e}")
+        return None
+    expected = HnswEmbeddingIndex if _use_hnsw() else Int8EmbeddingIndex
+    if type(saved["index"]) is not expected or saved.get("version", 1) != expected.STATE_VERSION:
+        return None
+    return saved["index"], saved["meta"]
@@ -0,0 +1,153 @@
+"""
+Multi-Keyword Scanner
+
+This module provides a small multi-pattern matcher used to find fixed phrases in
+user prompts and generated text. All keywords are compiled once and a text is
+scanned for every keyword in a single pass.
+
+The fastest available backend is selected at construction time:
+- Hyperscan: case-insensitive JIT-compiled DFA reporting each keyword once, no
+  lowercase copy of the input
+- Cython: compiled ``strstr`` loop from ``_keyword_scan.pyx`` over the lowercased input
+- pyahocorasick: Aho-Corasick automaton over the lowercased input
+- Pure Python: one substring check per keyword (always available)
+
+The Cython backend is opt-in; build it with ``cythonize -i app/core/_keyword_scan.pyx``.
+
+Keywords are expected to be lowercase ASCII phrases. When several keywords occur,
+every backend reports the one listed first, so results never depend on which
+backend is installed.
+"""
+
+import logging
+import re
+import threading
+from typing import Optional, Sequence, Set
+
+try:
+    import hyperscan
+except ImportError:  # optional accelerator, x86 Linux only
+    hyperscan = None
+
+try:
+    from core._keyword_scan import scan as _compiled_scan, scan_all as _compiled_scan_all
+except ImportError:  # extension not built
+    _compiled_scan = _compiled_scan_all = None
+
+try:
+    import ahocorasick
+except ImportError:  # optional accelerator
+    ahocorasick = None
+
+
+class KeywordScanner:
+    """
+    Case-insensitive scanner for a fixed set of keywords.
+
+    Attributes:
+        keywords (tuple): The keywords in priority order
+        backend (str): Name of the matching backend in use
+    """
+
+    def __init__(self, keywords: Sequence[str]):
+        """
+        Compile the keywords with the fastest available backend.
+
+        Args:
+            keywords: Lowercase phrases to scan for, in priority order
+        """
+        self.keywords = tuple(keywords)
+        self._database = None
+        self._automaton = None
+        self._lock = threading.Lock()
+
+        if hyperscan is not None:
+            try:
+                self._database = hyperscan.Database()
+                self._database.compile(
+                    expressions=[re.escape(keyword).encode() for keyword in self.keywords],
+                    ids=list(range(len(self.keywords))),
+                    elements=len(self.keywords),
+                    # One callback per keyword at most; only which keywords matched matters
+                    flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(self.keywords),
+                )
+            except Exception as e:
+                logging.warning(f"Hyperscan compilation failed, falling back: {e}")
+                self._database = None
+
+        self._encoded = None
+        if self._database is None and _compiled_scan is not None:
+            self._encoded = [keyword.encode("utf-8") for keyword in self.keywords]
+
+        if self._database is None and self._encoded is None and ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for index, keyword in enumerate(self.keywords):
+                self._automaton.add_word(keyword, (index, keyword))
+            self._automaton.make_automaton()
+
+        if self._database is not None:
+            self.backend = "hyperscan"
+        elif self._encoded is not None:
+            self.backend = "cython"
+        elif self._automaton is not None:
+            self.backend = "ahocorasick"
+        else:
+            self.backend = "python"
+
+    def first(self, text: str) -> Optional[str]:
+        """
+        Find the highest-priority keyword that occurs in the text.
+
+        Args:
+            text: Text to scan, in any case
+
+        Returns:
+            The matched keyword listed first in ``keywords``, or None if no keyword
+            occurs in the text
+        """
+        if self._database is not None:
+            matches = []
+
+            def on_match(keyword_id, start, end, flags, context):
+                matches.append(keyword_id)
+
+            # A compiled database shares one scratch space, so scans are serialized
+            with self._lock:
+                self._database.scan(text.encode("utf-8"), match_event_handler=on_match)
+            return self.keywords[min(matches)] if matches else None
+
+        text_lower = text.lower()
+        if self._encoded is not None:
+            index = _compiled_scan(text_lower.encode("utf-8"), self._encoded)
+            return self.keywords[index] if index >= 0 else None
+        if self._automaton is not None:
+            index = min((index for _, (index, _) in self._automaton.iter(text_lower)), default=None)
+            return self.keywords[index] if index is not None else None
+        return next((keyword for keyword in self.keywords if keyword in text_lower), None)
+
+    def findall(self, text: str) -> Set[str]:
+        """
+        Find every keyword that occurs anywhere in the text.
+
+        Args:
+            text: Text to scan, in any case
+
+        Returns:
+            Set of matched keywords
+        """
+        if self._database is not None:
+            found = set()
+
+            def on_match(keyword_id, start, end, flags, context):
+                found.add(self.keywords[keyword_id])
+
+            with self._lock:
+                self._database.scan(text.encode("utf-8"), match_event_handler=on_match)
+            return found
+
+        text_lower = text.lower()
+        if self._encoded is not None:
+            return {self.keywords[index] for index in _compiled_scan_all(text_lower.encode("utf-8"), self._encoded)}
+        if self._automaton is not None:
+            return {keyword for _, (_, keyword) in self._automaton.iter(text_lower)}
+        return {keyword for keyword in self.keywords if keyword in text_lower}
@@ -11,12 +11,125 @@ The service supports both standard and memory-aware operations:
 - Intent analysis for understanding user requests
 - Memory reference detection for context-aware responses
 
+Every operation is available both as a blocking method and as an ``*_async``
+coroutine so independent calls can be overlapped with ``asyncio.gather``. From
+synchronous code, run such coroutines with :meth:`LocalLLMService.run`, which keeps
+one event loop (and so one async connection pool) for the whole process. Ollama
+only serves those concurrently when it is started with parallel slots, e.g.::
+
+    OLLAMA_NUM_PARALLEL=4 OLLAMA_MAX_LOADED_MODELS=1 ollama serve
+
+Use :func:`get_llm_service` rather than constructing :class:`LocalLLMService` per
+request, so the whole process shares one warmed-up service and connection pool.
+
 Requires Ollama to be running locally with the DeepSeek model installed.
 """
 
+import asyncio
+import json
 import logging
+import os
+import re
+import threading
+import time
+import httpx
 import ollama
-from typing import Optional, List, Dict, Any
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Iterator, Sequence, Tuple
+
+from core.keyword_scan import KeywordScanner
+from core.semantic_cache import SemanticCache
+
+# Explicit phrases that reliably indicate a reference to a past creation
+MEMORY_REFERENCE_KEYWORDS = (
+    "like the one i made", "like i made", "like last time", "similar to my",
+    "like my", "my previous", "last time", "but this time", "remake",
+    "like before", "based on my", "new version", "like that one"
+)
+
+# Words that must appear before an ambiguous prompt is worth an LLM reference check;
+# prompts without any of them cannot refer to the user's own past work
+MEMORY_TRIGGER_WORDS = (
+    "my", "like", "again", "same", "before", "previous", "last", "remake", "version"
+)
+_TRIGGER_PATTERN = re.compile(r"\b(?:" + "|".join(MEMORY_TRIGGER_WORDS) + r")\b", re.IGNORECASE)
+
+# Grammar constraint for the memory reference check: the model can only emit "YES" or "NO"
+_YES_NO_FORMAT = {"type": "string", "enum": ["YES", "NO"]}
+
+# Static prompt heads. They stay byte-identical across calls and every per-request
+# part is appended after them, so Ollama can reuse the cached KV prefix.
+_SYS_EXPAND_HEAD = """You are a creative AI assistant specialized in expanding simple prompts into vivid, detailed descriptions for image generation. 
+
+Your task is to take a basic prompt and expand it into a rich, descriptive prompt that will generate stunning visuals. Focus on:
+- Visual details (colors, lighting, textures, composition)
+- Artistic style and mood
+- Environmental context
+- Technical photography/art terms when appropriate
+
+Keep the expansion focused and under 200 words. Return ONLY the expanded prompt, no explanations."""
+
+_SYS_EXPAND_MEMORY_TAIL = "\nUse these past creations as inspiration and context, but create something new and unique.\n"
+
+_INTENT_HEAD = """Analyze this creative prompt and extract key information. Return a JSON object with:
+- subject: main subject/object
+- style: artistic style or mood
+- setting: environment or background
+- intent: what the user wants to create"""
+
+_MEMORY_INTENT_FIELDS = """
+- memory_connection: how this relates to past creations (if any)
+- variation_type: if this is a variation of past work (remix, evolution, new take, etc.)"""
+
+_MEMORY_INTENT_ANALYSIS = """
+
+Also analyze:
+- How this request relates to past creations
+- Whether it's asking for variations, improvements, or completely new ideas
+- What elements from past creations might be relevant"""
+
+
+_ANALYZE_EXPAND_HEAD = """You are a creative AI assistant that analyzes simple prompts and expands them into vivid, detailed descriptions for image generation.
+
+For the prompt you are given, return a JSON object with:
+- subject: main subject/object
+- style: artistic style or mood
+- setting: environment or background
+- intent: what the user wants to create
+- expanded_prompt: a rich, descriptive image generation prompt under 200 words, covering visual details (colors, lighting, textures, composition), artistic style and mood, environmental context and technical photography/art terms when appropriate"""
+
+_ANALYZE_EXPAND_MEMORY_FIELDS = """
+- memory_connection: how this relates to the past creations below (if any)
+- variation_type: if this is a variation of past work (remix, evolution, new take, etc.)"""
+
+_ANALYSIS_FIELDS = ("subject", "style", "setting", "intent")
+_MEMORY_ANALYSIS_FIELDS = _ANALYSIS_FIELDS + ("memory_connection", "variation_type")
+
+
+def _analyze_expand_format(fields: Sequence[str]) -> Dict[str, Any]:
+    """JSON schema for the fused analysis + expansion answer with the given analysis fields."""
+    properties = {field: {"type": "string"} for field in (*fields, "expanded_prompt")}
+    return {"type": "object", "properties": properties, "required": list(properties)}
+
+
+_ANALYZE_EXPAND_FORMAT = _analyze_expand_format(_ANALYSIS_FIELDS)
+_MEMORY_ANALYZE_EXPAND_FORMAT = _analyze_expand_format(_MEMORY_ANALYSIS_FIELDS)
+
+# Built once at import; scans a prompt for every reference phrase in a single pass
+_KEYWORD_SCANNER = KeywordScanner(MEMORY_REFERENCE_KEYWORDS)
+
+
+def _scan_keywords(prompt: str) -> Optional[str]:
+    """
+    Find the first memory reference phrase in a prompt, ignoring case.
+    
+    Single matcher shared by keyword detection and the error fallback, so both
+    paths always agree.
+    
+    Returns:
+        The matched phrase, or None if the prompt contains none of them
+    """
+    return _KEYWORD_SCANNER.first(prompt)
 
 
 class LocalLLMService:
@@ -35,9 +148,16 @@ class LocalLLMService:
     Attributes:
         model_name (str): The name of the LLM model to use
         client (ollama.Client): The Ollama client instance for API communication
+        aclient (ollama.AsyncClient): Async Ollama client for the running event loop
+        _cache (Optional[SemanticCache]): Semantic cache of expansion, intent and memory-reference results
     """
     
-    def __init__(self, model_name: str = "deepseek-r1:1.5b"):
+    # Seconds a successful availability check is reused before probing Ollama again
+    _AVAILABILITY_TTL = 30.0
+    
+    def __init__(self,
+                 model_name: str = "deepseek-r1:1.5b",
+                 embedder: Optional[Callable[[str], Sequence[float]]] = None):
         """
         Initialize the LocalLLMService with the specified model.
         
@@ -45,11 +165,210 @@ class LocalLLMService:
             model_name: The name of the Ollama model to use for LLM operations.
                        Defaults to "deepseek-r1:1.5b" which provides good performance
                        for creative tasks while being resource-efficient.
+            embedder: Optional function returning an embedding for a prompt. When given,
+                     expansion, intent and memory-reference results are served from a
+                     semantic cache for near-identical prompts (see ``SEMCACHE_THRESHOLD``).
         """
         self.model_name = model_name
-        self.client = ollama.Client()
+        # One pooled keep-alive connection set per client; a refused connection is retried once
+        self._http_limits = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+        self._transport = httpx.HTTPTransport(retries=1, limits=self._http_limits)
+        self.client = ollama.Client(timeout=60.0, transport=self._transport)
+        self._aclient: Optional[ollama.AsyncClient] = None
+        self._atransport: Optional[httpx.AsyncHTTPTransport] = None
+        self._aclient_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Long-lived event loop used by run(), started on first use
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._embedder = embedder
+        self._cache = SemanticCache(embedder) if embedder else None
+        # Explicit per-call options keep the KV allocation sized to these short prompts
+        # and bound decode time. Free-text caps leave room for DeepSeek-R1's <think>
+        # preamble; grammar-constrained answers (JSON intent, YES/NO) need far fewer.
+        self._expand_opts = {"num_ctx": 2048, "num_predict": 768, "temperature": 0.7}
+        self._intent_opts = {"num_ctx": 2048, "num_predict": 256, "temperature": 0.1}
+        self._yesno_opts = {"num_ctx": 512, "num_predict": 8, "temperature": 0.0}
+        # Matches the server's parallel slots; batches are fanned out in waves of 4x this
+        self._num_parallel = max(1, int(os.getenv("OLLAMA_NUM_PARALLEL", "4")))
+        self._available_until = 0.0
+        # Exact-prompt memo of the YES/NO fallback; repeats (retries, double submits) skip Ollama
+        self._llm_yesno = lru_cache(maxsize=1024)(self._ask_yes_no)
+        # Keep the model resident between bursts instead of Ollama's 5 minute default
+        self._keep_alive = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
         logging.info(f"Initialized LocalLLMService with model: {model_name}")
+        # Loading the weights takes seconds; construction must not wait for it
+        threading.Thread(target=self._warm_up, name="ollama-warm-up", daemon=True).start()
+
+    def _warm_up(self) -> None:
+        """
+        Load the model once at startup so the first request doesn't pay the load latency.
+        
+        An empty generate request only loads the model and applies the keep-alive.
+        It runs in a background thread; requests sent meanwhile simply queue behind
+        the load in Ollama. Failures are logged and ignored; availability is checked
+        per request.
+        """
+        try:
+            self.client.generate(model=self.model_name, prompt="", keep_alive=self._keep_alive)
+            logging.info(f"Warmed up model {self.model_name} (keep_alive={self._keep_alive})")
+        except Exception as e:
+            logging.warning(f"Could not warm up model {self.model_name}: {e}")
+
+    def set_model(self, model_name: str) -> None:
+        """
+        Switch the Ollama model used for subsequent requests.
+        
+        Args:
+            model_name: The name of the Ollama model to use
+        """
+        self.model_name = model_name
+        self._llm_yesno.cache_clear()
+        logging.info(f"LocalLLMService switched to model: {model_name}")
+
+    def set_embedder(self, embedder: Optional[Callable[[str], Sequence[float]]]) -> None:
+        """
+        Replace the prompt embedding function keying the semantic cache.
+        
+        Embeddings of different functions are not comparable, so the cache starts
+        empty when the function changes; passing None disables it.
+        
+        Args:
+            embedder: Function returning an embedding for a prompt, or None
+        """
+        if embedder == self._embedder:
+            return
+        self._embedder = embedder
+        self._cache = SemanticCache(embedder) if embedder else None
+
+    @property
+    def aclient(self) -> ollama.AsyncClient:
+        """
+        Async Ollama client bound to the currently running event loop.
+        
+        The underlying httpx connection pool cannot be shared between event loops,
+        so a fresh client is created whenever the service is used from a new loop.
+        Coroutines started through :meth:`run` always share the service's own loop
+        and therefore one client; callers driving their own loops should end them
+        with :meth:`aclose`.
+        """
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            self._atransport = httpx.AsyncHTTPTransport(retries=1, limits=self._http_limits)
+            self._aclient = ollama.AsyncClient(timeout=60.0, transport=self._atransport)
+            self._aclient_loop = loop
+        return self._aclient
+
+    def run(self, coroutine: Awaitable[Any]) -> Any:
+        """
+        Run a coroutine on the service's long-lived event loop and wait for its result.
+        
+        The loop runs in a daemon thread started on first use, so every synchronous
+        caller in the process reuses one async client and its keep-alive connections
+        instead of building (and leaking) a pool per ``asyncio.run``.
+        
+        Args:
+            coroutine: Coroutine to run, typically built from the ``*_async`` methods
+            
+        Returns:
+            The coroutine's result; its exceptions propagate to the caller
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="llm-event-loop", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    async def aclose(self) -> None:
+        """Close the async client's connection pool for the running event loop, if open."""
+        if self._atransport is not None and self._aclient_loop is asyncio.get_running_loop():
+            await self._atransport.aclose()
+        self._aclient = None
+        self._atransport = None
+        self._aclient_loop = None
+
+    def close(self) -> None:
+        """Close the synchronous client's connection pool."""
+        self._transport.close()
+
+    def _chat_stream(self,
+                     messages: List[Dict[str, str]],
+                     options: Optional[Dict[str, Any]] = None,
+                     format: Optional[Any] = None) -> Iterator[str]:
+        """Send a streaming chat request and yield content deltas as they arrive."""
+        for part in self.client.chat(model=self.model_name, messages=messages, options=options,
+                                     format=format, keep_alive=self._keep_alive, stream=True):
+            yield part['message']['content']
+
+    def _chat(self,
+              messages: List[Dict[str, str]],
+              options: Optional[Dict[str, Any]] = None,
+              format: Optional[Any] = None) -> str:
+        """Send a blocking chat request and return the raw message content."""
+        # Deltas are buffered in a list and joined once instead of repeated concatenation
+        return "".join(self._chat_stream(messages, options, format))
+
+    async def _achat(self,
+                     messages: List[Dict[str, str]],
+                     options: Optional[Dict[str, Any]] = None,
+                     format: Optional[Any] = None) -> str:
+        """Send a non-blocking chat request and return the raw message content."""
+        chunks = []
+        async for part in await self.aclient.chat(model=self.model_name, messages=messages, options=options,
+                                                  format=format, keep_alive=self._keep_alive, stream=True):
+            chunks.append(part['message']['content'])
+        return "".join(chunks)
+
+    def _cached(self, operation: str, user_prompt: str, compute: Callable[[], Any]) -> Any:
+        """Serve ``compute()`` from the semantic cache, namespaced per operation and model."""
+        if self._cache is None:
+            return compute()
+        return self._cache.get_or_compute(f"{self.model_name}:{operation}", user_prompt, compute)
+
+    async def _acached(self, operation: str, user_prompt: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Async variant of :meth:`_cached`."""
+        if self._cache is None:
+            return await compute()
+        return await self._cache.aget_or_compute(f"{self.model_name}:{operation}", user_prompt, compute)
+
+    @staticmethod
+    def _memory_operation(operation: str, similar_memories: List[Dict[str, Any]] = None) -> str:
+        """Cache namespace for a memory-aware operation, keyed by the memories used as context."""
+        memory_ids = ",".join(str(memory.get('id', '')) for memory in (similar_memories or [])[:3])
+        return f"{operation}[{memory_ids}]"
     
+    def _memory_expansion_messages(self, user_prompt: str, similar_memories: List[Dict[str, Any]] = None) -> List[Dict[str, str]]:
+        """Build the chat messages for a (optionally memory-aware) prompt expansion."""
+        return [
+            {"role": "system", "content": _SYS_EXPAND_HEAD + self._expansion_memory_context(similar_memories)},
+            {"role": "user", "content": f"Expand this prompt for image generation: {user_prompt}"}
+        ]
+
+    @staticmethod
+    def _expansion_memory_context(similar_memories: List[Dict[str, Any]] = None) -> str:
+        """Describe the top similar memories for the expansion system prompt."""
+        # Build memory context if available
+        if not similar_memories:
+            return ""
+        
+        # Parts are collected in a list and joined once instead of repeated concatenation
+        parts = ["\n\nRELEVANT PAST CREATIONS:\n"]
+        for i, memory in enumerate(similar_memories[:3], 1):
+            similarity = memory.get('similarity', 0)
+            parts.append(f"{i}. \"{memory['prompt']}\" (similarity: {similarity:.1%})\n")
+            tags_str = memory.get('tags_str', '')
+            if tags_str:
+                parts.append(f"   Tags: {tags_str}\n")
+        parts.append(_SYS_EXPAND_MEMORY_TAIL)
+        
+        return "".join(parts)
+
+    def _expansion_messages(self, user_prompt: str) -> List[Dict[str, str]]:
+        """Build the chat messages for a standard prompt expansion."""
+        return [
+            {"role": "system", "content": _SYS_EXPAND_HEAD},
+            {"role": "user", "content": f"Expand this prompt for image generation: {user_prompt}"}
+        ]
+
     def expand_prompt_with_memory(self, user_prompt: str, similar_memories: List[Dict[str, Any]] = None) -> str:
         """
         Expand and enhance a user prompt using historical context from similar past creations.
@@ -68,39 +387,11 @@ class LocalLLMService:
             contextual elements from similar past creations while maintaining uniqueness
         """
         try:
-            # Build memory context if available
-            memory_context = ""
-            if similar_memories:
-                memory_context = "\n\nRELEVANT PAST CREATIONS:\n"
-                for i, memory in enumerate(similar_memories[:3], 1):
-                    similarity = memory.get('similarity', 0)
-                    memory_context += f"{i}. \"{memory['prompt']}\" (similarity: {similarity:.1%})\n"
-                    if memory.get('tags'):
-                        memory_context += f"   Tags: {', '.join(memory['tags'])}\n"
-                
-                memory_context += "\nUse these past creations as inspiration and context, but create something new and unique.\n"
-
-            system_prompt = f"""You are a creative AI assistant specialized in expanding simple prompts into vivid, detailed descriptions for image generation. 
-
-Your task is to take a basic prompt and expand it into a rich, descriptive prompt that will generate stunning visuals. Focus on:
-- Visual details (colors, lighting, textures, composition)
-- Artistic style and mood
-- Environmental context
-- Technical photography/art terms when appropriate
-
-{memory_context}
-
-Keep the expansion focused and under 200 words. Return ONLY the expanded prompt, no explanations."""
-
-            response = self.client.chat(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Expand this prompt for image generation: {user_prompt}"}
-                ]
+            messages = self._memory_expansion_messages(user_prompt, similar_memories)
+            expanded_prompt = self._cached(
+                self._memory_operation("expand_memory", similar_memories), user_prompt,
+                lambda: self._chat(messages, self._expand_opts).strip()
             )
-            
-            expanded_prompt = response['message']['content'].strip()
             logging.info(f"Memory-aware expansion - Original: {user_prompt}")
             logging.info(f"Memory-aware expansion - Enhanced: {expanded_prompt}")
             
@@ -111,6 +402,32 @@ Keep the expansion focused and under 200 words. Return ONLY the expanded prompt,
             # Fallback to regular expansion if memory-aware processing fails
             return self.expand_prompt(user_prompt)
 
+    async def expand_prompt_with_memory_async(self, user_prompt: str, similar_memories: List[Dict[str, Any]] = None) -> str:
+        """
+        Async variant of :meth:`expand_prompt_with_memory`.
+        
+        Args:
+            user_prompt: The original user prompt to expand
+            similar_memories: List of similar past creations to use as context
+            
+        Returns:
+            Enhanced and expanded prompt optimized for image generation
+        """
+        try:
+            messages = self._memory_expansion_messages(user_prompt, similar_memories)
+            expanded_prompt = (await self._acached(
+                self._memory_operation("expand_memory", similar_memories), user_prompt,
+                lambda: self._achat(messages, self._expand_opts)
+            )).strip()
+            logging.info(f"Memory-aware expansion - Original: {user_prompt}")
+            logging.info(f"Memory-aware expansion - Enhanced: {expanded_prompt}")
+            
+            return expanded_prompt
+            
+        except Exception as e:
+            logging.error(f"Error in memory-aware prompt expansion: {e}")
+            return await self.expand_prompt_async(user_prompt)
+
     def expand_prompt(self, user_prompt: str) -> str:
         """
         Expand and enhance a user prompt for improved image generation results.
@@ -127,25 +444,10 @@ Keep the expansion focused and under 200 words. Return ONLY the expanded prompt,
             Enhanced and expanded prompt optimized for image generation
         """
         try:
-            system_prompt = """You are a creative AI assistant specialized in expanding simple prompts into vivid, detailed descriptions for image generation. 
-
-Your task is to take a basic prompt and expand it into a rich, descriptive prompt that will generate stunning visuals. Focus on:
-- Visual details (colors, lighting, textures, composition)
-- Artistic style and mood
-- Environmental context
-- Technical photography/art terms when appropriate
-
-Keep the expansion focused and under 200 words. Return ONLY the expanded prompt, no explanations."""
-
-            response = self.client.chat(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Expand this prompt for image generation: {user_prompt}"}
-                ]
+            expanded_prompt = self._cached(
+                "expand", user_prompt,
+                lambda: self._chat(self._expansion_messages(user_prompt), self._expand_opts).strip()
             )
-            
-            expanded_prompt = response['message']['content'].strip()
             logging.info(f"Original prompt: {user_prompt}")
             logging.info(f"Expanded prompt: {expanded_prompt}")
             
@@ -155,7 +457,132 @@ Keep the expansion focused and under 200 words. Return ONLY the expanded prompt,
             logging.error(f"Error expanding prompt: {e}")
             # Fallback to original prompt if LLM expansion fails
             return user_prompt
-    
+
+    async def expand_prompt_async(self, user_prompt: str) -> str:
+        """
+        Async variant of :meth:`expand_prompt`.
+        
+        Args:
+            user_prompt: The original user prompt to expand
+            
+        Returns:
+            Enhanced and expanded prompt, or the original prompt if the LLM fails
+        """
+        try:
+            expanded_prompt = (await self._acached(
+                "expand", user_prompt,
+                lambda: self._achat(self._expansion_messages(user_prompt), self._expand_opts)
+            )).strip()
+            logging.info(f"Original prompt: {user_prompt}")
+            logging.info(f"Expanded prompt: {expanded_prompt}")
+            
+            return expanded_prompt
+            
+        except Exception as e:
+            logging.error(f"Error expanding prompt: {e}")
+            return user_prompt
+
+    def expand_prompt_stream(self, user_prompt: str) -> Iterator[str]:
+        """
+        Expand a user prompt, yielding the expansion incrementally as it is generated.
+        
+        Lets interfaces show the first words after prefill instead of waiting for the
+        full decode. Streamed results bypass the semantic cache.
+        
+        Args:
+            user_prompt: The original user prompt to expand
+            
+        Yields:
+            Chunks of the expanded prompt, or the original prompt if the LLM fails
+            before producing any output
+        """
+        emitted = False
+        try:
+            for delta in self._chat_stream(self._expansion_messages(user_prompt), self._expand_opts):
+                emitted = True
+                yield delta
+        except Exception as e:
+            logging.error(f"Error streaming prompt expansion: {e}")
+            if not emitted:
+                yield user_prompt
+
+    async def expand_prompts_async(self, prompts: List[str]) -> List[str]:
+        """
+        Expand several prompts concurrently.
+        
+        All requests in a wave are dispatched at once so Ollama can batch them across
+        its parallel slots; they share the same static system prompt and therefore the
+        same cached KV prefix. Waves are capped at ``4 * OLLAMA_NUM_PARALLEL`` requests
+        to avoid flooding the server queue.
+        
+        Args:
+            prompts: The original user prompts to expand
+            
+        Returns:
+            Expanded prompts in the same order as the input
+        """
+        wave_size = self._num_parallel * 4
+        expanded: List[str] = []
+        for start in range(0, len(prompts), wave_size):
+            wave = prompts[start:start + wave_size]
+            expanded.extend(await asyncio.gather(*(self.expand_prompt_async(prompt) for prompt in wave)))
+        return expanded
+
+    def expand_prompts(self, prompts: List[str]) -> List[str]:
+        """
+        Expand several prompts concurrently from synchronous code.
+        
+        Args:
+            prompts: The original user prompts to expand
+            
+        Returns:
+            Expanded prompts in the same order as the input
+        """
+        return self.run(self.expand_prompts_async(prompts))
+
+    def _memory_intent_messages(self, user_prompt: str, similar_memories: List[Dict[str, Any]] = None) -> List[Dict[str, str]]:
+        """Build the chat messages for memory-aware intent analysis."""
+        # Build memory context for analysis
+        memory_context = ""
+        memory_analysis = ""
+        
+        if similar_memories:
+            parts = ["\n\nPAST CREATIONS CONTEXT:\n"]
+            for i, memory in enumerate(similar_memories[:3], 1):
+                similarity = memory.get('similarity', 0)
+                parts.append(f"{i}. \"{memory['prompt']}\" ({similarity:.1%} similar)\n")
+                tags_str = memory.get('tags_str', '')
+                if tags_str:
+                    parts.append(f"   Style/Tags: {tags_str}\n")
+            memory_context = "".join(parts)
+            
+            memory_analysis = _MEMORY_INTENT_ANALYSIS
+
+        analysis_prompt = f"{_INTENT_HEAD}{_MEMORY_INTENT_FIELDS}{memory_context}\n\nPrompt to analyze: {user_prompt}{memory_analysis}"
+
+        return [{"role": "user", "content": analysis_prompt}]
+
+    @staticmethod
+    def _parse_analysis(content: str) -> Dict[str, Any]:
+        """Decode a JSON-mode analysis into its fields, or an empty dict if it isn't an object."""
+        try:
+            fields = json.loads(content)
+        except (json.JSONDecodeError, TypeError):
+            return {}
+        return fields if isinstance(fields, dict) else {}
+
+    def _memory_intent_result(self, user_prompt: str, content: str, similar_memories: List[Dict[str, Any]] = None,
+                              fields: Optional[Dict[str, Any]] = None) -> dict:
+        """Shape the memory-aware analysis into the public result dictionary."""
+        return {
+            **(fields if fields is not None else self._parse_analysis(content)),
+            "original_prompt": user_prompt,
+            "analysis": content.strip(),
+            "confidence": "high",
+            "memory_aware": len(similar_memories) > 0 if similar_memories else False,
+            "similar_count": len(similar_memories) if similar_memories else 0
+        }
+
     def interpret_memory_aware_intent(self, user_prompt: str, similar_memories: List[Dict[str, Any]] = None) -> dict:
         """
         Analyze user prompt to understand intent with awareness of past creations.
@@ -179,57 +606,62 @@ Keep the expansion focused and under 200 words. Return ONLY the expanded prompt,
             - variation_type: Type of variation if building on past work
         """
         try:
-            # Build memory context for analysis
-            memory_context = ""
-            memory_analysis = ""
-            
-            if similar_memories:
-                memory_context = "\n\nPAST CREATIONS CONTEXT:\n"
-                for i, memory in enumerate(similar_memories[:3], 1):
-                    similarity = memory.get('similarity', 0)
-                    memory_context += f"{i}. \"{memory['prompt']}\" ({similarity:.1%} similar)\n"
-                    if memory.get('tags'):
-                        memory_context += f"   Style/Tags: {', '.join(memory['tags'])}\n"
-                
-                memory_analysis = f"""
-
-Also analyze:
-- How this request relates to past creations
-- Whether it's asking for variations, improvements, or completely new ideas
-- What elements from past creations might be relevant"""
-
-            analysis_prompt = f"""Analyze this creative prompt and extract key information. Return a JSON-like response with:
-- subject: main subject/object
-- style: artistic style or mood
-- setting: environment or background
-- intent: what the user wants to create
-- memory_connection: how this relates to past creations (if any)
-- variation_type: if this is a variation of past work (remix, evolution, new take, etc.)
-
-{memory_context}
-
-Prompt to analyze: {user_prompt}{memory_analysis}"""
-
-            response = self.client.chat(
-                model=self.model_name,
-                messages=[
-                    {"role": "user", "content": analysis_prompt}
-                ]
-            )
-            
-            return {
-                "original_prompt": user_prompt,
-                "analysis": response['message']['content'].strip(),
-                "confidence": "high",
-                "memory_aware": len(similar_memories) > 0 if similar_memories else False,
-                "similar_count": len(similar_memories) if similar_memories else 0
-            }
+            content = self._chat(self._memory_intent_messages(user_prompt, similar_memories), self._intent_opts, format="json")
+            return self._memory_intent_result(user_prompt, content, similar_memories)
             
         except Exception as e:
             logging.error(f"Error in memory-aware intent analysis: {e}")
             # Fallback to standard intent analysis if memory-aware processing fails
             return self.interpret_user_intent(user_prompt)
-    
+
+    async def interpret_memory_aware_intent_async(self, user_prompt: str, similar_memories: List[Dict[str, Any]] = None) -> dict:
+        """
+        Async variant of :meth:`interpret_memory_aware_intent`.
+        
+        Args:
+            user_prompt: The user's input prompt to analyze
+            similar_memories: List of similar past creations for contextual analysis
+            
+        Returns:
+            Dictionary containing the memory-aware analysis results
+        """
+        try:
+            content = await self._achat(self._memory_intent_messages(user_prompt, similar_memories), self._intent_opts, format="json")
+            return self._memory_intent_result(user_prompt, content, similar_memories)
+            
+        except Exception as e:
+            logging.error(f"Error in memory-aware intent analysis: {e}")
+            return await self.interpret_user_intent_async(user_prompt)
+
+    def _intent_messages(self, user_prompt: str) -> List[Dict[str, str]]:
+        """Build the chat messages for standard intent analysis."""
+        analysis_prompt = f"{_INTENT_HEAD}\n\nPrompt to analyze: {user_prompt}"
+
+        return [{"role": "user", "content": analysis_prompt}]
+
+    def _intent_result(self, user_prompt: str, content: str, fields: Optional[Dict[str, Any]] = None) -> dict:
+        """
+        Shape the JSON-mode intent analysis into the public result dictionary.
+        
+        The decoded fields (subject, style, setting, intent) are merged into the
+        result; the raw text is kept under ``analysis`` for logging and storage and
+        is the only content if the answer could not be decoded.
+        """
+        return {
+            **(fields if fields is not None else self._parse_analysis(content)),
+            "original_prompt": user_prompt,
+            "analysis": content.strip(),
+            "confidence": "high"
+        }
+
+    def _intent_failure(self, user_prompt: str) -> dict:
+        """Result returned when intent analysis could not be performed."""
+        return {
+            "original_prompt": user_prompt,
+            "analysis": "Unable to analyze prompt",
+            "confidence": "low"
+        }
+
     def interpret_user_intent(self, user_prompt: str) -> dict:
         """
         Analyze user prompt to understand intent and extract key creative elements.
@@ -249,76 +681,188 @@ Prompt to analyze: {user_prompt}{memory_analysis}"""
             - intent: What the user wants to create
         """
         try:
-            analysis_prompt = f"""Analyze this creative prompt and extract key information. Return a JSON-like response with:
-- subject: main subject/object
-- style: artistic style or mood
-- setting: environment or background
-- intent: what the user wants to create
-
-Prompt to analyze: {user_prompt}"""
+            content = self._cached("intent", user_prompt, lambda: self._chat(self._intent_messages(user_prompt), self._intent_opts, format="json"))
+            return self._intent_result(user_prompt, content)
+            
+        except Exception as e:
+            logging.error(f"Error interpreting user intent: {e}")
+            return self._intent_failure(user_prompt)
 
-            response = self.client.chat(
-                model=self.model_name,
-                messages=[
-                    {"role": "user", "content": analysis_prompt}
-                ]
-            )
+    async def interpret_user_intent_async(self, user_prompt: str) -> dict:
+        """
+        Async variant of :meth:`interpret_user_intent`.
+        
+        Args:
+            user_prompt: The user's input prompt to analyze
             
-            # For now, return a simple analysis
-            # In a production system, you'd parse the JSON response
-            return {
-                "original_prompt": user_prompt,
-                "analysis": response['message']['content'].strip(),
-                "confidence": "high"
-            }
+        Returns:
+            Dictionary containing analysis results
+        """
+        try:
+            content = await self._acached("intent", user_prompt, lambda: self._achat(self._intent_messages(user_prompt), self._intent_opts, format="json"))
+            return self._intent_result(user_prompt, content)
             
         except Exception as e:
             logging.error(f"Error interpreting user intent: {e}")
-            return {
-                "original_prompt": user_prompt,
-                "analysis": "Unable to analyze prompt",
-                "confidence": "low"
-            }
-    
-    def detect_memory_reference(self, user_prompt: str) -> dict:
+            return self._intent_failure(user_prompt)
+
+    def _analyze_expand_messages(self, user_prompt: str, similar_memories: List[Dict[str, Any]] = None) -> List[Dict[str, str]]:
+        """Build the chat messages for the fused analysis + expansion request."""
+        if similar_memories is None:
+            system_prompt = _ANALYZE_EXPAND_HEAD
+        else:
+            system_prompt = (_ANALYZE_EXPAND_HEAD + _ANALYZE_EXPAND_MEMORY_FIELDS
+                             + self._expansion_memory_context(similar_memories))
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Analyze and expand this prompt for image generation: {user_prompt}"}
+        ]
+
+    @staticmethod
+    def _parse_analyze_expand(content: str) -> Dict[str, str]:
         """
-        Detect if the user is referencing past creations in their prompt using reliable keyword detection.
+        Parse the schema-constrained fused answer.
+        
+        Raises:
+            ValueError: If the answer is not a JSON object with a non-empty expansion
+        """
+        data = json.loads(content)
+        if not isinstance(data, dict) or not str(data.get("expanded_prompt", "")).strip():
+            raise ValueError("Fused response is missing the expanded prompt")
+        return {key: str(value).strip() for key, value in data.items()}
+
+    def _analyze_expand_result(self, user_prompt: str, fields: Dict[str, str],
+                               similar_memories: List[Dict[str, Any]] = None) -> Tuple[dict, str]:
+        """Split the fused answer into the intent analysis result and the expanded prompt."""
+        fields = dict(fields)
+        expanded_prompt = fields.pop("expanded_prompt")
+        analysis = json.dumps(fields, indent=2)
+        if similar_memories is None:
+            user_analysis = self._intent_result(user_prompt, analysis, fields)
+        else:
+            user_analysis = self._memory_intent_result(user_prompt, analysis, similar_memories, fields)
+        logging.info(f"Fused analysis + expansion - Original: {user_prompt}")
+        logging.info(f"Fused analysis + expansion - Enhanced: {expanded_prompt}")
+        return user_analysis, expanded_prompt
+
+    def analyze_and_expand(self, user_prompt: str, similar_memories: List[Dict[str, Any]] = None) -> Tuple[dict, str]:
+        """
+        Analyze intent and expand a prompt with a single LLM request.
+        
+        Equivalent to calling the intent analysis and expansion methods on the same
+        prompt, but the model reads the prompt (and memory context) once and answers
+        both in one schema-constrained JSON object. Falls back to the separate calls
+        if the fused request fails or returns an unusable answer.
         
         Args:
-            user_prompt (str): The user's input prompt
+            user_prompt: The original user prompt
+            similar_memories: Similar past creations to use as context. When None the
+                            standard (non memory-aware) analysis and expansion are used
             
         Returns:
-            dict: Information about memory references found
+            Tuple of (user_analysis, expanded_prompt) shaped like the results of
+            :meth:`interpret_user_intent` / :meth:`interpret_memory_aware_intent` and
+            :meth:`expand_prompt` / :meth:`expand_prompt_with_memory`
         """
+        memory_aware = similar_memories is not None
+        response_format = _MEMORY_ANALYZE_EXPAND_FORMAT if memory_aware else _ANALYZE_EXPAND_FORMAT
         try:
-            # First, use reliable keyword detection
-            prompt_lower = user_prompt.lower()
-            reliable_keywords = [
-                "like the one i made", "like i made", "like last time", "similar to my", 
-                "like my", "my previous", "last time", "but this time", "remake",
-                "like before", "based on my", "new version", "like that one"
-            ]
-            
-            keyword_detected = False
-            detected_phrase = ""
-            for keyword in reliable_keywords:
-                if keyword in prompt_lower:
-                    keyword_detected = True
-                    detected_phrase = keyword
-                    break
-            
-            # If keywords detected, return immediately
-            if keyword_detected:
-                logging.info(f"Memory reference detected via keyword: '{detected_phrase}'")
-                return {
-                    "has_memory_reference": True,
-                    "confidence": "high",
-                    "explanation": f"Found explicit memory reference: '{detected_phrase}'",
-                    "reference_type": "time_reference" if "time" in detected_phrase else "variation"
-                }
-            
-            # For ambiguous cases, use LLM but with stricter parsing
-            analysis_prompt = f"""Analyze this prompt for memory references. Answer ONLY with YES or NO.
+            messages = self._analyze_expand_messages(user_prompt, similar_memories)
+            fields = self._cached(
+                self._memory_operation("analyze_expand", similar_memories) if memory_aware else "analyze_expand",
+                user_prompt,
+                lambda: self._parse_analyze_expand(self._chat(messages, self._expand_opts, format=response_format))
+            )
+            return self._analyze_expand_result(user_prompt, fields, similar_memories)
+            
+        except Exception as e:
+            logging.error(f"Error in fused analysis + expansion, using separate calls: {e}")
+            if memory_aware:
+                return (self.interpret_memory_aware_intent(user_prompt, similar_memories),
+                        self.expand_prompt_with_memory(user_prompt, similar_memories))
+            return self.interpret_user_intent(user_prompt), self.expand_prompt(user_prompt)
+
+    async def analyze_and_expand_async(self, user_prompt: str, similar_memories: List[Dict[str, Any]] = None) -> Tuple[dict, str]:
+        """
+        Async variant of :meth:`analyze_and_expand`.
+        
+        The fallback runs the separate analysis and expansion calls concurrently.
+        
+        Args:
+            user_prompt: The original user prompt
+            similar_memories: Similar past creations to use as context, or None
+            
+        Returns:
+            Tuple of (user_analysis, expanded_prompt)
+        """
+        memory_aware = similar_memories is not None
+        response_format = _MEMORY_ANALYZE_EXPAND_FORMAT if memory_aware else _ANALYZE_EXPAND_FORMAT
+
+        async def compute() -> Dict[str, str]:
+            messages = self._analyze_expand_messages(user_prompt, similar_memories)
+            return self._parse_analyze_expand(await self._achat(messages, self._expand_opts, format=response_format))
+
+        try:
+            fields = await self._acached(
+                self._memory_operation("analyze_expand", similar_memories) if memory_aware else "analyze_expand",
+                user_prompt, compute
+            )
+            return self._analyze_expand_result(user_prompt, fields, similar_memories)
+            
+        except Exception as e:
+            logging.error(f"Error in fused analysis + expansion, using separate calls: {e}")
+            if memory_aware:
+                return tuple(await asyncio.gather(
+                    self.interpret_memory_aware_intent_async(user_prompt, similar_memories),
+                    self.expand_prompt_with_memory_async(user_prompt, similar_memories),
+                ))
+            return tuple(await asyncio.gather(
+                self.interpret_user_intent_async(user_prompt),
+                self.expand_prompt_async(user_prompt),
+            ))
+
+    def _keyword_memory_reference(self, detected_phrase: Optional[str]) -> Optional[dict]:
+        """
+        Shape the result of the reliable keyword pass of memory reference detection.
+        
+        Args:
+            detected_phrase: Phrase found by :func:`_scan_keywords`, if any
+            
+        Returns:
+            The detection result if an explicit reference phrase was found, otherwise None
+        """
+        if detected_phrase is None:
+            return None
+        
+        logging.info(f"Memory reference detected via keyword: '{detected_phrase}'")
+        return {
+            "has_memory_reference": True,
+            "confidence": "high",
+            "explanation": f"Found explicit memory reference: '{detected_phrase}'",
+            "reference_type": "time_reference" if "time" in detected_phrase else "variation"
+        }
+
+    def _untriggered_memory_reference(self, user_prompt: str) -> Optional[dict]:
+        """
+        Rule out a memory reference without the LLM when no trigger word is present.
+        
+        Returns:
+            A decisive "no reference" result, or None if the LLM check is still needed
+        """
+        if _TRIGGER_PATTERN.search(user_prompt):
+            return None
+        
+        return {
+            "has_memory_reference": False,
+            "confidence": "high",
+            "explanation": "No memory trigger words in prompt",
+            "reference_type": "none"
+        }
+
+    def _memory_reference_messages(self, user_prompt: str) -> List[Dict[str, str]]:
+        """Build the chat messages for the LLM memory reference check."""
+        # For ambiguous cases, use LLM but with stricter parsing
+        analysis_prompt = f"""Analyze this prompt for memory references. Answer ONLY with YES or NO.
 
 Look for these EXACT phrases in the prompt:
 - "like the one I made" / "like I made"
@@ -331,70 +875,199 @@ Prompt: "{user_prompt}"
 
 Does this prompt contain ANY of these exact phrases? Answer YES or NO only."""
 
-            response = self.client.chat(
-                model=self.model_name,
-                messages=[
-                    {"role": "user", "content": analysis_prompt}
-                ]
+        return [{"role": "user", "content": analysis_prompt}]
+
+    def _ask_yes_no(self, model_name: str, user_prompt: str) -> str:
+        """
+        Ask the LLM whether the prompt references past creations.
+        
+        Wrapped per instance in an LRU cache keyed on ``(model_name, user_prompt)``;
+        ``model_name`` is part of the key so answers never leak across models.
+        Decoding is grammar-constrained to the JSON strings ``"YES"`` or ``"NO"``.
+        
+        Returns:
+            The raw answer text from the model
+        """
+        return self._chat(self._memory_reference_messages(user_prompt), self._yesno_opts, format=_YES_NO_FORMAT)
+
+    def _parse_memory_reference(self, content: str) -> dict:
+        """Parse the grammar-constrained YES/NO answer into a detection result."""
+        try:
+            answer = json.loads(content)
+        except (json.JSONDecodeError, TypeError):
+            answer = content
+        response_text = str(answer).strip().upper()
+        
+        if response_text == "YES":
+            has_reference = True
+            confidence = "medium"
+            explanation = "LLM detected memory reference"
+        elif response_text == "NO":
+            has_reference = False
+            confidence = "high"
+            explanation = "No memory reference detected"
+        else:
+            # Only reachable if the server ignored the format constraint
+            has_reference = False
+            confidence = "low"
+            explanation = "Ambiguous LLM response, defaulting to no reference"
+        
+        logging.info(f"LLM-based detection: {has_reference} - {explanation}")
+        
+        return {
+            "has_memory_reference": has_reference,
+            "confidence": confidence,
+            "explanation": explanation,
+            "reference_type": "variation" if has_reference else "none",
+            "llm_response": response_text
+        }
+
+    def _keyword_fallback(self, detected_phrase: Optional[str]) -> dict:
+        """Keyword-only detection used when the LLM check fails, reusing the keyword pass."""
+        # Fallback to keyword detection only
+        has_reference = detected_phrase is not None
+        
+        return {
+            "has_memory_reference": has_reference,
+            "confidence": "medium",
+            "explanation": f"Keyword detection: {'Found' if has_reference else 'No'} memory indicators",
+            "reference_type": "variation" if has_reference else "none"
+        }
+
+    def detect_memory_reference(self, user_prompt: str) -> dict:
+        """
+        Detect if the user is referencing past creations in their prompt using reliable keyword detection.
+        
+        Args:
+            user_prompt (str): The user's input prompt
+            
+        Returns:
+            dict: Information about memory references found
+        """
+        # The prompt is scanned once; the error fallback reuses the same match
+        detected_phrase = None
+        try:
+            # First, use reliable keyword detection
+            detected_phrase = _scan_keywords(user_prompt)
+            # If keywords detected, or no trigger word makes a reference possible, return immediately
+            keyword_result = self._keyword_memory_reference(detected_phrase) or self._untriggered_memory_reference(user_prompt)
+            if keyword_result:
+                return keyword_result
+            
+            # Near-identical prompts reuse an earlier answer when a semantic cache is configured
+            return self._cached(
+                "memory_reference", user_prompt,
+                lambda: self._parse_memory_reference(self._llm_yesno(self.model_name, user_prompt))
             )
             
-            response_text = response['message']['content'].strip().upper()
-            
-            # Strict parsing - only accept clear YES/NO
-            if "YES" in response_text and "NO" not in response_text:
-                has_reference = True
-                confidence = "medium"
-                explanation = "LLM detected memory reference"
-            elif "NO" in response_text and "YES" not in response_text:
-                has_reference = False
-                confidence = "high"
-                explanation = "No memory reference detected"
-            else:
-                # Default to no reference for ambiguous responses
-                has_reference = False
-                confidence = "low"
-                explanation = "Ambiguous LLM response, defaulting to no reference"
-            
-            logging.info(f"LLM-based detection: {has_reference} - {explanation}")
-            
-            return {
-                "has_memory_reference": has_reference,
-                "confidence": confidence,
-                "explanation": explanation,
-                "reference_type": "variation" if has_reference else "none",
-                "llm_response": response_text
-            }
+        except Exception as e:
+            logging.error(f"Error in memory reference detection: {e}")
+            return self._keyword_fallback(detected_phrase)
+
+    async def detect_memory_reference_async(self, user_prompt: str) -> dict:
+        """
+        Async variant of :meth:`detect_memory_reference`.
+        
+        Args:
+            user_prompt (str): The user's input prompt
+            
+        Returns:
+            dict: Information about memory references found
+        """
+        detected_phrase = None
+        try:
+            detected_phrase = _scan_keywords(user_prompt)
+            keyword_result = self._keyword_memory_reference(detected_phrase) or self._untriggered_memory_reference(user_prompt)
+            if keyword_result:
+                return keyword_result
+            
+            # Run the memoized call in a worker thread so both variants share one cache
+            async def compute():
+                answer = await asyncio.to_thread(self._llm_yesno, self.model_name, user_prompt)
+                return self._parse_memory_reference(answer)
+            
+            return await self._acached("memory_reference", user_prompt, compute)
             
         except Exception as e:
             logging.error(f"Error in memory reference detection: {e}")
-            # Fallback to keyword detection only
-            prompt_lower = user_prompt.lower()
-            reliable_keywords = [
-                "like the one i made", "like i made", "like last time", "similar to my", 
-                "like my", "my previous", "last time", "but this time", "remake"
-            ]
-            has_reference = any(keyword in prompt_lower for keyword in reliable_keywords)
-            
-            return {
-                "has_memory_reference": has_reference,
-                "confidence": "medium",
-                "explanation": f"Keyword detection: {'Found' if has_reference else 'No'} memory indicators",
-                "reference_type": "variation" if has_reference else "none"
-            }
+            return self._keyword_fallback(detected_phrase)
     
+    def _record_availability(self, models: Any) -> bool:
+        """Check a model listing for the configured model and remember a positive result."""
+        base_name = self.model_name.split(':')[0]
+        for model in models['models']:
+            # Newer ollama clients report the tag as 'model', older ones as 'name'
+            name = model.get('model') or model.get('name') or ''
+            if name.startswith(base_name):
+                self._available_until = time.monotonic() + self._AVAILABILITY_TTL
+                return True
+        logging.error(f"LLM service not available: model '{self.model_name}' is not installed")
+        return False
+
     def is_available(self) -> bool:
         """
         Check if the LLM service is available and responsive.
         
+        Lists the installed models (``/api/tags``) instead of running a chat, so the
+        probe is a single cheap HTTP round-trip that never loads the model. Positive
+        results are reused for a short TTL to avoid hammering Ollama.
+        
         Returns:
             bool: True if service is available, False otherwise
         """
+        if time.monotonic() < self._available_until:
+            return True
         try:
-            response = self.client.chat(
-                model=self.model_name,
-                messages=[{"role": "user", "content": "Hello"}]
-            )
+            return self._record_availability(self.client.list())
+        except Exception as e:
+            logging.error(f"LLM service not available: {e}")
+            return False
+
+    async def is_available_async(self) -> bool:
+        """
+        Async variant of :meth:`is_available`.
+        
+        Returns:
+            bool: True if service is available, False otherwise
+        """
+        if time.monotonic() < self._available_until:
             return True
+        try:
+            return self._record_availability(await self.aclient.list())
         except Exception as e:
             logging.error(f"LLM service not available: {e}")
-            return False 
\ No newline at end of file
+            return False
+
+
+# The process-wide service returned by get_llm_service
+_shared_service: Optional[LocalLLMService] = None
+_shared_service_lock = threading.Lock()
+
+
+def get_llm_service(model_name: Optional[str] = None,
+                    embedder: Optional[Callable[[str], Sequence[float]]] = None) -> LocalLLMService:
+    """
+    Return the process-wide LocalLLMService, creating it on first use.
+    
+    Every call returns the same instance, so the process keeps a single warm-up
+    and connection pool. Arguments given to later calls reconfigure it instead:
+    a model name switches its model and an embedder replaces its semantic cache.
+    
+    Args:
+        model_name: The name of the Ollama model to use. Defaults to "deepseek-r1:1.5b"
+                   on creation and to the current model afterwards
+        embedder: Optional prompt embedding function enabling the semantic cache
+        
+    Returns:
+        LocalLLMService: The shared service instance
+    """
+    global _shared_service
+    with _shared_service_lock:
+        if _shared_service is None:
+            _shared_service = LocalLLMService(model_name or "deepseek-r1:1.5b", embedder=embedder)
+            return _shared_service
+        if model_name and model_name != _shared_service.model_name:
+            _shared_service.set_model(model_name)
+        if embedder is not None:
+            _shared_service.set_embedder(embedder)
+        return _shared_service
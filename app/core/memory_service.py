@@ -17,15 +17,194 @@ The service stores comprehensive metadata about each creation including original
 expanded prompts, LLM analysis, generated files, and automatically extracted tags.
 """
 
+import os
+
+# Encoder inference threads: half the cores by default, leaving room for the web
+# server and Chroma. Set before the numeric libraries load so OpenMP/MKL size their
+# pools to match instead of spawning one thread per core.
+ENCODER_THREADS = int(os.getenv("MEMORY_ENCODER_THREADS", max(1, (os.cpu_count() or 4) // 2)))
+os.environ.setdefault("OMP_NUM_THREADS", str(ENCODER_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(ENCODER_THREADS))
+
+import asyncio
+import atexit
 import chromadb
+import hashlib
 import json
 import logging
+import itertools
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict, deque
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from functools import cached_property, lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
-import os
+import platform
 import uuid
 
+from core.embedding_index import EmbeddingIndex, create_embedding_index, load_embedding_index
+from core.keyword_scan import KeywordScanner
+
+torch.set_num_threads(ENCODER_THREADS)
+try:
+    torch.set_num_interop_threads(1)
+except RuntimeError:  # already fixed once any parallel work has run in this process
+    pass
+
+# Base sentence transformer; 'all-MiniLM-L6-v2' gives a good balance of speed and quality
+ENCODER_MODEL = 'all-MiniLM-L6-v2'
+
+# Per-field character budget of the embedding text; the encoder truncates at 256
+# tokens anyway, so longer fields only add tokenization work
+EMBEDDING_FIELD_CHARS = 512
+
+# Embeddings of recently stored texts reused for byte-identical resubmissions
+EMBEDDING_CACHE_SIZE = 2048
+
+# Number of most recent memories kept in process for get_recent_memories
+RECENT_WINDOW = 256
+
+# Flushes a queued creation may fail before it is dropped instead of requeued
+MAX_WRITE_ATTEMPTS = 3
+
+# The saved search index is rewritten in full, so it is only saved once this many
+# rows were added since the last save, after INDEX_SAVE_INTERVAL seconds, or at exit
+INDEX_SAVE_ROWS = 64
+INDEX_SAVE_INTERVAL = 300.0
+
+# Common creative keywords to look for
+CREATIVE_KEYWORDS = (
+    # Objects
+    'robot', 'dragon', 'castle', 'forest', 'city', 'mountain', 'ocean', 'space', 'planet',
+    'car', 'ship', 'building', 'tree', 'flower', 'animal', 'bird', 'fish', 'creature',
+    'sword', 'shield', 'crown', 'gem', 'crystal', 'magic', 'spell', 'potion',
+    
+    # Styles
+    'cyberpunk', 'steampunk', 'fantasy', 'sci-fi', 'medieval', 'futuristic', 'vintage',
+    'modern', 'ancient', 'mystical', 'magical', 'dark', 'bright', 'colorful', 'glowing',
+    'metallic', 'wooden', 'stone', 'glass',
+    
+    # Environments
+    'sunset', 'sunrise', 'night', 'day', 'storm', 'rain', 'snow', 'desert', 'jungle',
+    'underwater', 'sky', 'clouds', 'stars', 'moon', 'sun',
+    
+    # Emotions/Moods
+    'peaceful', 'dramatic', 'mysterious', 'epic', 'serene', 'chaotic', 'beautiful',
+    'terrifying', 'majestic', 'elegant', 'powerful', 'delicate'
+)
+
+# Basic categorization: a category tag is added when any of its words occurs
+TAG_CATEGORIES = {
+    'sci-fi': ('robot', 'cyberpunk', 'futuristic', 'sci-fi'),
+    'fantasy': ('dragon', 'magic', 'fantasy', 'medieval', 'castle'),
+    'nature': ('nature', 'forest', 'tree', 'flower', 'mountain'),
+    'urban': ('city', 'building', 'urban', 'street'),
+}
+
+# Tags are stored as one string joined by the ASCII unit separator (tags are plain words)
+TAG_SEPARATOR = "\x1f"
+
+
+def _decode_tags(value: Optional[str]) -> List[str]:
+    """Decode the stored ``tags`` metadata; records written before the separator format hold JSON."""
+    if not value:
+        return []
+    if value.startswith('['):
+        return json.loads(value)
+    return value.split(TAG_SEPARATOR)
+
+
+# Keywords and category words compiled once; a text is scanned for all of them in one pass
+_TAG_SCANNER = KeywordScanner(dict.fromkeys(
+    CREATIVE_KEYWORDS + tuple(word for words in TAG_CATEGORIES.values() for word in words)
+))
+
+class _EmbeddingDiskCache:
+    """
+    SQLite table of embeddings that survives restarts and is shared between processes.
+    
+    Keys are digests of the encoder variant and the text, so embeddings of different
+    encoders never mix.
+    """
+    
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+    
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """Return the stored embeddings of the keys that are present."""
+        rows = []
+        with self._lock:
+            # Stay below SQLite's bound parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows.extend(self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+        return {key: np.frombuffer(vector, dtype=np.float32) for key, vector in rows}
+    
+    def put_many(self, items: List[Tuple[bytes, np.ndarray]]) -> None:
+        """Store embeddings, replacing existing entries."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items]
+            )
+            self._conn.commit()
+
+
+class _MetadataColumns:
+    """
+    Append-only columnar copy of the metadata search results are built from.
+    
+    Each field is one list indexed by row, so a search only reads the rows of its
+    hits and never asks ChromaDB again for a memory it has already seen. Memories
+    are never modified after they are stored, so rows never go stale.
+    """
+    
+    FIELDS = ('prompt', 'expanded_prompt', 'llm_analysis', 'image_file', 'model_file',
+              'timestamp', 'tags', 'tags_str', 'date', 'time')
+    
+    def __init__(self):
+        self._rows: Dict[str, int] = {}
+        self._columns: Dict[str, List[Any]] = {field: [] for field in self.FIELDS}
+        self._lock = threading.Lock()
+    
+    def __contains__(self, memory_id: str) -> bool:
+        return memory_id in self._rows
+    
+    def add(self, ids: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Append the metadata of memories that are not stored yet."""
+        with self._lock:
+            for memory_id, metadata in zip(ids, metadatas):
+                if metadata is None or memory_id in self._rows:
+                    continue
+                self._rows[memory_id] = len(self._rows)
+                tags = _decode_tags(metadata.get('tags'))
+                for field in ('prompt', 'expanded_prompt', 'llm_analysis', 'image_file',
+                              'model_file', 'timestamp', 'date', 'time'):
+                    self._columns[field].append(metadata.get(field, ''))
+                self._columns['tags'].append(tags)
+                # Older records predate the stored column
+                self._columns['tags_str'].append(metadata.get('tags_str') or ', '.join(tags))
+    
+    def record(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        """Assemble the memory fields of one stored row, or None if it is unknown."""
+        row = self._rows.get(memory_id)
+        if row is None:
+            return None
+        # Tags are copied so callers cannot change the stored column
+        return {field: (list(column[row]) if field == 'tags' else column[row])
+                for field, column in self._columns.items()}
+
+
 class MemoryService:
     """
     AI Memory Service using ChromaDB for semantic search and memory management.
@@ -42,10 +221,15 @@ class MemoryService:
         persist_directory (str): Directory path for persistent storage
         client (chromadb.PersistentClient): ChromaDB client for database operations
         collection (chromadb.Collection): ChromaDB collection for storing memories
-        encoder (SentenceTransformer): Sentence transformer for generating embeddings
+        encoder (SentenceTransformer): Sentence transformer for generating embeddings,
+                                       loaded on first access
+        write_batch_size (int): Number of queued creations that triggers a batched write
     """
     
-    def __init__(self, persist_directory: str = "datastore/memory"):
+    # Seconds a computed get_memory_stats result is reused (covers UI polling)
+    _STATS_TTL = 30.0
+    
+    def __init__(self, persist_directory: str = "datastore/memory", write_batch_size: int = 32):
         """
         Initialize the memory service with ChromaDB and sentence transformers.
         
@@ -56,8 +240,36 @@ class MemoryService:
         Args:
             persist_directory: Directory path to persist the ChromaDB database.
                              Defaults to "datastore/memory" for organized storage.
+            write_batch_size: Queued creations are encoded and written together once
+                            this many are pending (see :meth:`store_creation`).
         """
         self.persist_directory = persist_directory
+        self.write_batch_size = write_batch_size
+        
+        # Creations queued by store_creation, written in one batch by flush()
+        self._pending: List[Tuple[str, str, Dict[str, Any]]] = []
+        self._pending_lock = threading.Lock()
+        # Failed write attempts of queued creations, by memory ID
+        self._write_attempts: Dict[str, int] = {}
+        
+        # Newest-last window of recent memories, primed on first use and then extended
+        # with rows newer than the watermark (including writes from other processes)
+        self._recent: Optional[deque] = None
+        self._recent_watermark = 0.0
+        self._recent_seen = 0
+        self._recent_lock = threading.Lock()
+        
+        self._stats: Optional[Dict[str, Any]] = None
+        self._stats_until = 0.0
+        
+        # In-process mirror of the stored embeddings used for search, loaded on first
+        # search and then extended with rows newer than the watermark
+        self._index: Optional[EmbeddingIndex] = None
+        self._index_watermark = 0.0
+        self._index_lock = threading.Lock()
+        self._index_unsaved = 0
+        self._index_saved_at = time.monotonic()
+        self._hit_metadata = _MetadataColumns()
         
         # Ensure directory exists for persistent storage
         os.makedirs(persist_directory, exist_ok=True)
@@ -71,12 +283,233 @@ class MemoryService:
             metadata={"description": "User creative AI generations with semantic search"}
         )
         
-        # Initialize sentence transformer for embeddings
-        # Using 'all-MiniLM-L6-v2' for good balance of speed and quality
-        self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
+        # The sentence transformer is loaded on first use (see ``encoder``)
+        # Query embeddings for repeated searches (retries, "similar creations" panels)
+        self._query_embedding = lru_cache(maxsize=512)(self._encode_query)
+        # blake2b digest of an embedding text -> its embedding, in LRU order
+        self._embedding_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+        # Behind the LRU: embeddings persisted across restarts (e.g. demo reruns)
+        try:
+            self._embedding_disk_cache: Optional[_EmbeddingDiskCache] = _EmbeddingDiskCache(
+                os.path.join(persist_directory, "embedding_cache.sqlite")
+            )
+        except sqlite3.Error as e:
+            logging.warning(f"Persistent embedding cache unavailable: {e}")
+            self._embedding_disk_cache = None
+        
+        # The memory count is reported by get_memory_stats; counting here would cost a scan at boot
+        logging.info(f"Memory Service initialized at {persist_directory}")
+        
+        # Queued creations must not be lost when the process exits; registered last so
+        # it runs first, before the index is saved
+        atexit.register(self._save_index_at_exit)
+        atexit.register(self.flush)
+    
+    @cached_property
+    def encoder(self) -> SentenceTransformer:
+        """
+        Sentence transformer for embeddings, loaded the first time it is needed.
+        
+        Storing and searching load it; processes that only list recent memories or
+        read stats never pay the model load.
+        """
+        return self._load_encoder()
+    
+    def _load_encoder(self) -> SentenceTransformer:
+        """
+        Load the embedding model, preferring a dynamically int8-quantized ONNX export.
+        
+        The quantized model is exported once next to the memory store (under
+        ``models/minilm-int8-onnx``) and reused on later starts. It produces embeddings
+        compatible with the FP32 model, so existing memories stay searchable. Falls
+        back to the FP32 PyTorch model when ONNX Runtime / Optimum are not installed or
+        ``MEMORY_ENCODER_BACKEND=torch`` is set.
+        
+        Returns:
+            SentenceTransformer: The loaded encoder
+        """
+        self._encoder_variant = f"{ENCODER_MODEL}:torch"
+        if os.getenv("MEMORY_ENCODER_BACKEND", "onnx") != "onnx":
+            return SentenceTransformer(ENCODER_MODEL)
+        
+        # ARM CPUs get the arm64 kernels; x86 uses the AVX512-VNNI int8 configuration
+        quantization = "arm64" if platform.machine().lower() in ("arm64", "aarch64") else "avx512_vnni"
+        model_dir = os.path.join(os.path.dirname(self.persist_directory) or ".", "models", "minilm-int8-onnx")
+        file_name = f"onnx/model_qint8_{quantization}.onnx"
+        
+        try:
+            import onnxruntime
+            
+            # ONNX Runtime keeps its own thread pool; size it like the PyTorch one
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = ENCODER_THREADS
+            session_options.inter_op_num_threads = 1
+            model_kwargs = {"file_name": file_name, "provider": "CPUExecutionProvider",
+                            "session_options": session_options}
+            
+            if not os.path.exists(os.path.join(model_dir, file_name)):
+                from sentence_transformers import export_dynamic_quantized_onnx_model
+                
+                logging.info(f"Exporting int8 ONNX encoder to {model_dir} (first start only)")
+                onnx_model = SentenceTransformer(ENCODER_MODEL, backend="onnx")
+                onnx_model.save(model_dir)
+                export_dynamic_quantized_onnx_model(onnx_model, quantization, model_dir)
+            
+            encoder = SentenceTransformer(model_dir, backend="onnx", model_kwargs=model_kwargs)
+            self._encoder_variant = f"{ENCODER_MODEL}:onnx-qint8-{quantization}"
+            logging.info(f"Loaded int8 ONNX encoder ({quantization})")
+            return encoder
+            
+        except Exception as e:
+            logging.warning(f"Quantized ONNX encoder unavailable, using FP32 PyTorch model: {e}")
+            return SentenceTransformer(ENCODER_MODEL)
+    
+    def _encode_query(self, query: str) -> bytes:
+        """
+        Encode a normalized search query.
+        
+        Wrapped per instance in an LRU cache; the embedding is returned as float32
+        bytes so cached entries are immutable and compact (~1.5 KB each). Misses go
+        through the same embedding caches as stored texts.
+        """
+        return np.asarray(self._embed_texts([query])[0], dtype=np.float32).tobytes()
+    
+    def embed_query(self, text: str) -> np.ndarray:
+        """
+        Embed a prompt or query through the service's embedding caches.
+        
+        Searches use the same path, so a prompt embedded here (for example as a
+        semantic cache key) is encoded once and found again by the search.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Normalized float32 embedding (read-only)
+        """
+        # The encoder's tokenizer is uncased, so lowercasing only widens cache hits
+        return np.frombuffer(self._query_embedding(text.strip().lower()), dtype=np.float32)
+    
+    def _build_record(self,
+                      prompt: str,
+                      expanded_prompt: str,
+                      llm_analysis: str,
+                      image_file: str,
+                      model_file: str,
+                      execution_id: str) -> Tuple[str, str, Dict[str, Any]]:
+        """
+        Build the id, embedding text and metadata stored for one creation.
+        
+        Returns:
+            Tuple of (memory_id, embedding_text, metadata)
+        """
+        # Generate unique memory identifier
+        memory_id = str(uuid.uuid4())
+        
+        # Extract semantic tags from prompts and analysis (full fields, before truncation)
+        tags = self._extract_tags(prompt, expanded_prompt, llm_analysis)
+        # Joined once here so prompt-building readers never re-join per request
+        tags_str = ', '.join(tags)
+        
+        # Create comprehensive text for embedding generation
+        # This combines all textual information for semantic search on a single line,
+        # so no indentation or newlines are spent as tokens
+        budget = EMBEDDING_FIELD_CHARS
+        embedding_text = (
+            f"Original: {prompt[:budget]} | Expanded: {expanded_prompt[:budget]} | "
+            f"Analysis: {llm_analysis[:budget]} | Tags: {tags_str}"
+        )
+        
+        # One clock read; date and time are sliced from the ISO string instead of strftime
+        now = datetime.now()
+        timestamp = now.isoformat()
+        
+        # Create comprehensive metadata for storage
+        metadata = {
+            "prompt": prompt,
+            "expanded_prompt": expanded_prompt,
+            "llm_analysis": llm_analysis,
+            "image_file": image_file,
+            "model_file": model_file,
+            "execution_id": execution_id,
+            "timestamp": timestamp,
+            "ts_epoch": now.timestamp(),
+            "tags": TAG_SEPARATOR.join(tags),
+            "tags_str": tags_str,
+            "date": timestamp[:10],
+            "time": timestamp[11:19]
+        }
         
-        existing_count = self.collection.count()
-        logging.info(f"Memory Service initialized with {existing_count} existing memories")
+        return memory_id, embedding_text, metadata
+    
+    def _embed_texts(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Embed texts, reusing embeddings of byte-identical earlier texts.
+        
+        Texts are looked up in the in-process LRU, then in the persistent cache; only
+        the remaining misses reach the encoder, in a single batch.
+        """
+        keys = [hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest() for text in texts]
+        with self._embedding_cache_lock:
+            embeddings = [self._embedding_cache.get(key) for key in keys]
+            for key, embedding in zip(keys, embeddings):
+                if embedding is not None:
+                    self._embedding_cache.move_to_end(key)
+        
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if not missing:
+            return embeddings
+        
+        # The encoder must be loaded to know which variant's persisted embeddings apply
+        encoder = self.encoder
+        disk_keys = {
+            i: hashlib.blake2b(f"{self._encoder_variant}\0{texts[i]}".encode('utf-8'), digest_size=16).digest()
+            for i in missing
+        }
+        found = {}
+        if self._embedding_disk_cache is not None:
+            try:
+                found = self._embedding_disk_cache.get_many(list(disk_keys.values()))
+            except sqlite3.Error as e:
+                logging.warning(f"Persistent embedding cache lookup failed: {e}")
+        
+        to_encode = [i for i in missing if disk_keys[i] not in found]
+        if to_encode:
+            # Generate semantic embeddings for similarity search in a single batch
+            encoded = encoder.encode([texts[i] for i in to_encode], batch_size=32,
+                                     normalize_embeddings=True, convert_to_numpy=True)
+            for i, embedding in zip(to_encode, encoded):
+                found[disk_keys[i]] = embedding
+            if self._embedding_disk_cache is not None:
+                try:
+                    self._embedding_disk_cache.put_many([(disk_keys[i], found[disk_keys[i]]) for i in to_encode])
+                except sqlite3.Error as e:
+                    logging.warning(f"Persistent embedding cache write failed: {e}")
+        
+        with self._embedding_cache_lock:
+            for i in missing:
+                embeddings[i] = found[disk_keys[i]]
+                self._embedding_cache[keys[i]] = embeddings[i]
+            while len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+        
+        return embeddings
+    
+    def _write_records(self, records: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """Encode a batch of records in one encoder call and store them in one add."""
+        texts = [text for _, text, _ in records]
+        embeddings = self._embed_texts(texts)
+        
+        # Store in ChromaDB with embeddings and metadata
+        self.collection.add(
+            embeddings=[embedding.tolist() for embedding in embeddings],
+            documents=texts,
+            metadatas=[metadata for _, _, metadata in records],
+            ids=[memory_id for memory_id, _, _ in records]
+        )
+        # Our own writes make cached stats stale immediately
+        self._stats = None
     
     def store_creation(self, 
                       prompt: str, 
@@ -86,12 +519,52 @@ class MemoryService:
                       model_file: str,
                       execution_id: str) -> str:
         """
+        Queue a new creation for storage in memory with semantic embeddings.
+        
+        The creation is written together with other queued creations once
+        ``write_batch_size`` are pending, on :meth:`flush`, before any read from this
+        service, or at process exit. Use :meth:`store_creation_now` when another process
+        must be able to read the creation immediately.
+        
+        Args:
+            prompt: Original user prompt that initiated the creation
+            expanded_prompt: LLM-enhanced version of the original prompt
+            llm_analysis: Analysis and interpretation from the LLM service
+            image_file: Path to the generated image file
+            model_file: Path to the generated 3D model file
+            execution_id: Unique identifier for this execution session
+            
+        Returns:
+            Unique memory ID for the queued creation, or None if it could not be queued
+        """
+        try:
+            record = self._build_record(prompt, expanded_prompt, llm_analysis, image_file, model_file, execution_id)
+            with self._pending_lock:
+                self._pending.append(record)
+                should_flush = len(self._pending) >= self.write_batch_size
+            
+            if should_flush:
+                self.flush()
+            return record[0]
+            
+        except Exception as e:
+            logging.error(f"Error storing creation in memory: {e}")
+            return None
+    
+    def store_creation_now(self, 
+                           prompt: str, 
+                           expanded_prompt: str,
+                           llm_analysis: str,
+                           image_file: str,
+                           model_file: str,
+                           execution_id: str) -> str:
+        """
         Store a new creation in memory with semantic embeddings for future retrieval.
         
         This method stores comprehensive information about a creative generation session,
         including the original prompt, expanded prompt, LLM analysis, generated files,
         and automatically extracted tags. It creates semantic embeddings for efficient
-        similarity-based retrieval.
+        similarity-based retrieval. The creation is persisted before this method returns.
         
         Args:
             prompt: Original user prompt that initiated the creation
@@ -105,53 +578,126 @@ class MemoryService:
             Unique memory ID for the stored creation, or None if storage failed
         """
         try:
-            # Generate unique memory identifier
-            memory_id = str(uuid.uuid4())
-            
-            # Extract semantic tags from prompts and analysis
-            tags = self._extract_tags(prompt, expanded_prompt, llm_analysis)
-            
-            # Create comprehensive text for embedding generation
-            # This combines all textual information for semantic search
-            embedding_text = f"""
-            Original: {prompt}
-            Expanded: {expanded_prompt}
-            Analysis: {llm_analysis}
-            Tags: {', '.join(tags)}
-            """
-            
-            # Generate semantic embedding for similarity search
-            embedding = self.encoder.encode(embedding_text).tolist()
-            
-            # Create comprehensive metadata for storage
-            metadata = {
-                "prompt": prompt,
-                "expanded_prompt": expanded_prompt,
-                "llm_analysis": llm_analysis,
-                "image_file": image_file,
-                "model_file": model_file,
-                "execution_id": execution_id,
-                "timestamp": datetime.now().isoformat(),
-                "tags": json.dumps(tags),
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "time": datetime.now().strftime("%H:%M:%S")
-            }
+            record = self._build_record(prompt, expanded_prompt, llm_analysis, image_file, model_file, execution_id)
+            self._write_records([record])
             
-            # Store in ChromaDB with embedding and metadata
-            self.collection.add(
-                embeddings=[embedding],
-                documents=[embedding_text],
-                metadatas=[metadata],
-                ids=[memory_id]
-            )
-            
-            logging.info(f"Stored creation in memory: {memory_id} - '{prompt[:50]}...'")
-            return memory_id
+            logging.info(f"Stored creation in memory: {record[0]} - '{prompt[:50]}...'")
+            return record[0]
             
         except Exception as e:
             logging.error(f"Error storing creation in memory: {e}")
             return None
     
+    def store_creations_batch(self, creations: List[Dict[str, str]]) -> List[Optional[str]]:
+        """
+        Store several creations with a single batched encode and database write.
+        
+        The creations are written before this method returns and are not queued for
+        a retry; if the batch write fails, they are written one by one.
+        
+        Args:
+            creations: Dictionaries with the keyword arguments of :meth:`store_creation`
+            
+        Returns:
+            Memory IDs in input order, or None for creations that failed to store
+        """
+        memory_ids: List[Optional[str]] = []
+        records = []
+        for creation in creations:
+            try:
+                record = self._build_record(**creation)
+            except Exception as e:
+                logging.error(f"Error storing creation in memory: {e}")
+                memory_ids.append(None)
+                continue
+            records.append(record)
+            memory_ids.append(record[0])
+        
+        failed = {memory_id for memory_id, _, _ in self._write_each(records)} if records else set()
+        return [None if memory_id in failed else memory_id for memory_id in memory_ids]
+    
+    def _write_each(self, records: List[Tuple[str, str, Dict[str, Any]]]) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Write records in one batch, falling back to one write per record if it fails.
+        
+        A single bad record then only fails itself instead of the whole batch.
+        
+        Returns:
+            The records that could not be written
+        """
+        try:
+            self._write_records(records)
+            return []
+        except Exception as e:
+            if len(records) == 1:
+                logging.error(f"Error storing memory {records[0][0]}: {e}")
+                return records
+            logging.warning(f"Batch write of {len(records)} memories failed, writing them one by one: {e}")
+        
+        failed = []
+        for record in records:
+            try:
+                self._write_records([record])
+            except Exception as e:
+                logging.error(f"Error storing memory {record[0]}: {e}")
+                failed.append(record)
+        return failed
+    
+    def flush(self) -> int:
+        """
+        Write all queued creations to the database.
+        
+        Creations that fail to write stay queued for the next flush, and are dropped
+        (and logged) after ``MAX_WRITE_ATTEMPTS`` failed attempts.
+        
+        Returns:
+            Number of creations written
+        """
+        with self._pending_lock:
+            records, self._pending = self._pending, []
+        if not records:
+            return 0
+        
+        failed = self._write_each(records)
+        failed_ids = {memory_id for memory_id, _, _ in failed}
+        retry = []
+        for record in records:
+            memory_id = record[0]
+            if memory_id not in failed_ids:
+                self._write_attempts.pop(memory_id, None)
+                continue
+            attempts = self._write_attempts.get(memory_id, 0) + 1
+            if attempts < MAX_WRITE_ATTEMPTS:
+                self._write_attempts[memory_id] = attempts
+                retry.append(record)
+            else:
+                self._write_attempts.pop(memory_id, None)
+                logging.error(f"Dropping memory {memory_id} after {attempts} failed writes: "
+                              f"'{record[2].get('prompt', '')[:50]}...'")
+        
+        if retry:
+            # Keep them queued so a later flush can retry them
+            with self._pending_lock:
+                self._pending[:0] = retry
+        
+        written = len(records) - len(failed)
+        if written:
+            logging.info(f"Stored {written} queued creations in memory")
+        return written
+    
+    def count(self) -> int:
+        """
+        Number of stored memories, after writing any queued creations.
+        
+        Memories are never modified or removed, so the count also identifies the
+        version of the store.
+        
+        Returns:
+            Number of memories in the database
+        """
+        self.flush()
+        return self.collection.count()
+    
     def search_memories(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
         """
         Search memories using semantic similarity to find relevant past creations.
@@ -168,42 +714,208 @@ class MemoryService:
             List of matching memories with metadata, sorted by similarity score
         """
         try:
-            # Generate embedding for the search query
-            query_embedding = self.encoder.encode(query).tolist()
-            
-            # Perform semantic search in ChromaDB
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=limit,
-                include=["metadatas", "documents", "distances"]
-            )
+            self.flush()
             
-            # Format results into structured memory objects
-            memories = []
-            if results['metadatas'] and results['metadatas'][0]:
-                for i, metadata in enumerate(results['metadatas'][0]):
-                    memory = {
-                        "id": results['ids'][0][i],
-                        "prompt": metadata.get('prompt', ''),
-                        "expanded_prompt": metadata.get('expanded_prompt', ''),
-                        "llm_analysis": metadata.get('llm_analysis', ''),
-                        "image_file": metadata.get('image_file', ''),
-                        "model_file": metadata.get('model_file', ''),
-                        "timestamp": metadata.get('timestamp', ''),
-                        "tags": json.loads(metadata.get('tags', '[]')),
-                        "similarity": 1 - results['distances'][0][i],  # Convert distance to similarity
-                        "date": metadata.get('date', ''),
-                        "time": metadata.get('time', '')
-                    }
-                    memories.append(memory)
-            
-            logging.info(f"Found {len(memories)} memories for query: '{query}'")
-            return memories
+            # Generate embedding for the search query
+            query_embedding = self.embed_query(query)
+            return self._search_by_embedding(query, query_embedding, limit)
             
         except Exception as e:
             logging.error(f"Error searching memories: {e}")
             return []
     
+    def search_memories_batch(self, queries: List[str], limit: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Search memories for several queries, embedding all of them in one encoder batch.
+        
+        Queries that normalize to the same text are embedded and scanned once and
+        share their results.
+        
+        Args:
+            queries: Natural language search queries
+            limit: Maximum number of results per query, defaults to 5
+            
+        Returns:
+            One list of matching memories per query, in query order
+        """
+        try:
+            self.flush()
+            normalized = [query.strip().lower() for query in queries]
+            unique = list(dict.fromkeys(normalized))
+            embeddings = self._embed_texts(unique)
+            unique_results = dict(zip(unique, self._search_by_embeddings(unique, embeddings, limit)))
+            # Each query gets its own records so callers may modify them independently
+            return [[{**memory, "tags": list(memory["tags"])} for memory in unique_results[text]]
+                    for text in normalized]
+        except Exception as e:
+            logging.error(f"Error searching memories: {e}")
+            return [[] for _ in queries]
+    
+    def _search_by_embedding(self, query: str, query_embedding: np.ndarray, limit: int) -> List[Dict[str, Any]]:
+        """
+        Search the index with a query embedding and format the hits as memories.
+        
+        Args:
+            query: The query text, used for logging
+            query_embedding: Normalized embedding of the query
+            limit: Maximum number of results to return
+            
+        Returns:
+            List of matching memories with metadata, sorted by similarity score
+        """
+        return self._search_by_embeddings([query], [query_embedding], limit)[0]
+    
+    def _search_by_embeddings(self,
+                              queries: List[str],
+                              query_embeddings: List[np.ndarray],
+                              limit: int) -> List[List[Dict[str, Any]]]:
+        """
+        Search the index with several query embeddings in one batch.
+        
+        The index scores every query in one call. Hit metadata comes from an
+        in-process columnar copy; hits it does not hold yet are fetched from ChromaDB
+        in a single request.
+        
+        Args:
+            queries: The query texts, used for logging
+            query_embeddings: Normalized embeddings of the queries
+            limit: Maximum number of results per query
+            
+        Returns:
+            One list of matching memories per query, sorted by similarity score
+        """
+        # Perform semantic search over the in-process index
+        with self._index_lock:
+            self._refresh_index()
+            batch_hits = self._index.search_batch(query_embeddings, limit)
+        
+        # Fetch metadata from ChromaDB only for hits not seen by this process yet
+        missing = list(dict.fromkeys(
+            memory_id for hits in batch_hits for memory_id, _ in hits if memory_id not in self._hit_metadata
+        ))
+        if missing:
+            results = self.collection.get(ids=missing, include=["metadatas"])
+            self._hit_metadata.add(results['ids'], results['metadatas'])
+        
+        return [self._format_hits(query, hits) for query, hits in zip(queries, batch_hits)]
+    
+    def _format_hits(self, query: str, hits: List[Tuple[str, float]]) -> List[Dict[str, Any]]:
+        """Turn index hits into memory records using the stored metadata columns."""
+        # Format results into structured memory objects
+        memories = []
+        for memory_id, cosine in hits:
+            memory = self._hit_metadata.record(memory_id)
+            if memory is not None:
+                memory["id"] = memory_id
+                # Same scale as Chroma's former ``1 - squared L2 distance`` of unit vectors
+                memory["similarity"] = 2 * cosine - 1
+                memories.append(memory)
+        
+        logging.info(f"Found {len(memories)} memories for query: '{query}'")
+        return memories
+    
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.persist_directory, "search_index.pkl")
+    
+    def _refresh_index(self) -> None:
+        """
+        Bring the search index up to date. Caller must hold ``_index_lock``.
+        
+        The first call resumes from the index saved by a previous run (or loads every
+        stored embedding when there is none or it no longer matches the store); later
+        calls only fetch rows whose ``ts_epoch`` is newer than the last one seen
+        (including other processes' writes). ``ts_epoch`` is stamped when a record is
+        built, so a queued record can be committed after newer ones; whenever the
+        index is then short of the store, the missing ids are fetched directly. New
+        rows are saved in batches (see ``INDEX_SAVE_ROWS``), not on every refresh.
+        """
+        if self._index is None:
+            loaded = load_embedding_index(self._index_path)
+            if loaded is not None:
+                self._index, meta = loaded
+                self._index_watermark = float(meta.get("watermark", 0.0))
+                self._index_unsaved += self._add_to_index()
+                if len(self._index) != self.collection.count():
+                    self._index_unsaved += self._add_missing_to_index()
+                if len(self._index) == self.collection.count():
+                    self._maybe_save_index()
+                    return
+                # Out of step with the store (e.g. rows without ts_epoch), rebuild it
+            
+            self._index = create_embedding_index()
+            self._index_watermark = 0.0
+            # A full rebuild is worth keeping right away
+            self._index_unsaved = INDEX_SAVE_ROWS
+        
+        self._index_unsaved += self._add_to_index()
+        if len(self._index) != self.collection.count():
+            self._index_unsaved += self._add_missing_to_index()
+        self._maybe_save_index()
+    
+    def _add_to_index(self) -> int:
+        """
+        Add stored rows newer than the index watermark to the index.
+        
+        Returns:
+            Number of rows added
+        """
+        if len(self._index):
+            results = self.collection.get(
+                where={"ts_epoch": {"$gt": self._index_watermark}},
+                include=["embeddings", "metadatas"]
+            )
+        else:
+            results = self.collection.get(include=["embeddings", "metadatas"])
+        
+        if not len(results['ids']):
+            return 0
+        added = self._index.add(results['ids'], results['embeddings'])
+        # The rows were fetched with their metadata, so later hits need no lookup
+        self._hit_metadata.add(results['ids'], results['metadatas'])
+        self._index_watermark = max(
+            [self._index_watermark] + [float(metadata.get('ts_epoch') or 0.0) for metadata in results['metadatas']]
+        )
+        return added
+    
+    def _add_missing_to_index(self) -> int:
+        """
+        Add stored rows the watermark query skipped, found by diffing ids.
+        
+        Returns:
+            Number of rows added
+        """
+        stored_ids = self.collection.get(include=[])['ids']
+        missing = [memory_id for memory_id in stored_ids if memory_id not in self._index]
+        if not missing:
+            return 0
+        results = self.collection.get(ids=missing, include=["embeddings", "metadatas"])
+        added = self._index.add(results['ids'], results['embeddings'])
+        self._hit_metadata.add(results['ids'], results['metadatas'])
+        logging.info(f"Added {added} late-committed memories to the search index")
+        return added
+    
+    def _maybe_save_index(self) -> None:
+        """Save the index if enough rows were added or time passed. Caller must hold ``_index_lock``."""
+        if self._index_unsaved and (self._index_unsaved >= INDEX_SAVE_ROWS or
+                                    time.monotonic() - self._index_saved_at >= INDEX_SAVE_INTERVAL):
+            self._save_index()
+    
+    def _save_index_at_exit(self) -> None:
+        """Save rows added since the last save when the process exits."""
+        with self._index_lock:
+            if self._index is not None and self._index_unsaved:
+                self._save_index()
+    
+    def _save_index(self) -> None:
+        """Save the search index so the next start does not rebuild it."""
+        try:
+            self._index.save(self._index_path, {"watermark": self._index_watermark})
+            self._index_unsaved = 0
+            self._index_saved_at = time.monotonic()
+        except OSError as e:
+            logging.warning(f"Could not save search index: {e}")
+    
     def get_recent_memories(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Retrieve the most recently created memories for display and context.
@@ -212,6 +924,9 @@ class MemoryService:
         useful for showing recent activity and providing quick access to
         latest work in user interfaces.
         
+        Memories are served from an in-process window of the last ``RECENT_WINDOW``
+        creations, so ``limit`` is capped at that size.
+        
         Args:
             limit: Maximum number of memories to return, defaults to 10
             
@@ -219,30 +934,11 @@ class MemoryService:
             List of recent memories sorted by creation time (most recent first)
         """
         try:
-            # Retrieve all memories with metadata
-            all_results = self.collection.get(
-                include=["metadatas"],
-                limit=limit
-            )
+            self.flush()
             
-            memories = []
-            if all_results['metadatas']:
-                for i, metadata in enumerate(all_results['metadatas']):
-                    memory = {
-                        "id": all_results['ids'][i],
-                        "prompt": metadata.get('prompt', ''),
-                        "image_file": metadata.get('image_file', ''),
-                        "model_file": metadata.get('model_file', ''),
-                        "timestamp": metadata.get('timestamp', ''),
-                        "tags": json.loads(metadata.get('tags', '[]')),
-                        "date": metadata.get('date', ''),
-                        "time": metadata.get('time', '')
-                    }
-                    memories.append(memory)
-                
-                # Sort by timestamp (most recent first)
-                memories.sort(key=lambda x: x['timestamp'], reverse=True)
-                memories = memories[:limit]
+            with self._recent_lock:
+                self._refresh_recent()
+                memories = list(self._recent)[::-1][:limit]
             
             logging.info(f"Retrieved {len(memories)} recent memories")
             return memories
@@ -251,42 +947,85 @@ class MemoryService:
             logging.error(f"Error getting recent memories: {e}")
             return []
     
+    @staticmethod
+    def _recent_entry(memory_id: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Lightweight memory record returned by get_recent_memories."""
+        return {
+            "id": memory_id,
+            "prompt": metadata.get('prompt', ''),
+            "image_file": metadata.get('image_file', ''),
+            "model_file": metadata.get('model_file', ''),
+            "timestamp": metadata.get('timestamp', ''),
+            "tags": _decode_tags(metadata.get('tags')),
+            "date": metadata.get('date', ''),
+            "time": metadata.get('time', '')
+        }
+    
+    @staticmethod
+    def _creation_epoch(metadata: Dict[str, Any]) -> float:
+        """Creation time of a memory; older records only carry the ISO timestamp."""
+        if metadata.get('ts_epoch') is not None:
+            return float(metadata['ts_epoch'])
+        try:
+            return datetime.fromisoformat(metadata.get('timestamp', '')).timestamp()
+        except ValueError:
+            return 0.0
+    
+    def _refresh_recent(self) -> None:
+        """
+        Bring the recent-memories window up to date. Caller must hold ``_recent_lock``.
+        
+        The first call loads every record once; later calls only fetch rows whose
+        ``ts_epoch`` is newer than the last one seen. ``ts_epoch`` is stamped when a
+        record is built, so a queued record can be committed after newer ones; when
+        the rows seen no longer add up to ``collection.count()``, the window is
+        reloaded in full so such a row takes its place in creation order.
+        """
+        if self._recent is not None:
+            total_count = self.collection.count()
+            results = self.collection.get(
+                where={"ts_epoch": {"$gt": self._recent_watermark}},
+                include=["metadatas"]
+            )
+            if self._recent_seen + len(results['ids']) != total_count:
+                self._recent = None
+        if self._recent is None:
+            results = self.collection.get(include=["metadatas"])
+            self._recent = deque(maxlen=RECENT_WINDOW)
+            self._recent_watermark = 0.0
+            self._recent_seen = 0
+        
+        rows = sorted(zip(results['ids'], results['metadatas'] or []),
+                      key=lambda row: self._creation_epoch(row[1]))
+        self._recent_seen += len(rows)
+        for memory_id, metadata in rows:
+            self._recent.append(self._recent_entry(memory_id, metadata))
+            self._recent_watermark = max(self._recent_watermark, float(metadata.get('ts_epoch') or 0.0))
+    
     def get_memory_stats(self) -> Dict[str, Any]:
         """
         Get statistics about stored memories.
         
+        Results are reused for ``_STATS_TTL`` seconds, or until this service writes.
+        
         Returns:
             Dictionary with memory statistics
         """
         try:
-            total_count = self.collection.count()
-            
-            # Get all memories to analyze
-            all_results = self.collection.get(include=["metadatas"])
+            self.flush()
+            if self._stats is not None and time.monotonic() < self._stats_until:
+                return self._stats
             
-            # Analyze tags
-            all_tags = []
-            dates = []
-            
-            if all_results['metadatas']:
-                for metadata in all_results['metadatas']:
-                    tags = json.loads(metadata.get('tags', '[]'))
-                    all_tags.extend(tags)
-                    dates.append(metadata.get('date', ''))
-            
-            # Count tag frequency
-            tag_counts = {}
-            for tag in all_tags:
-                tag_counts[tag] = tag_counts.get(tag, 0) + 1
+            total_count = self.collection.count()
+            aggregate = self._update_stats_aggregate(total_count)
+            tag_counts = aggregate["tag_counts"]
             
             # Get top tags
-            top_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+            top_tags = Counter(tag_counts).most_common(10)
             
-            # Get date range
-            dates = [d for d in dates if d]
             date_range = {
-                "earliest": min(dates) if dates else None,
-                "latest": max(dates) if dates else None
+                "earliest": aggregate["earliest"],
+                "latest": aggregate["latest"]
             }
             
             stats = {
@@ -295,6 +1034,8 @@ class MemoryService:
                 "date_range": date_range,
                 "unique_tags": len(tag_counts)
             }
+            self._stats = stats
+            self._stats_until = time.monotonic() + self._STATS_TTL
             
             logging.info(f"📊 Memory stats: {total_count} total memories, {len(tag_counts)} unique tags")
             return stats
@@ -303,62 +1044,98 @@ class MemoryService:
             logging.error(f"❌ Error getting memory stats: {e}")
             return {"total_memories": 0, "top_tags": [], "date_range": {}, "unique_tags": 0}
     
-    def _extract_tags(self, prompt: str, expanded_prompt: str, llm_analysis: str) -> List[str]:
+    @property
+    def _stats_path(self) -> str:
+        return os.path.join(self.persist_directory, "stats.json")
+    
+    @staticmethod
+    def _empty_stats_aggregate() -> Dict[str, Any]:
+        return {"count": 0, "watermark": 0.0, "tag_counts": {}, "earliest": None, "latest": None}
+    
+    def _update_stats_aggregate(self, total_count: int) -> Dict[str, Any]:
+        """
+        Bring the persisted running stats (``stats.json``) up to date and return them.
+        
+        Only rows newer than the stored ``ts_epoch`` watermark are read and folded in,
+        so any process sharing the store catches up incrementally. The aggregate is
+        rebuilt with one full pass when the sidecar is missing or its row count no
+        longer matches the collection (e.g. records without ``ts_epoch``).
+        
+        Args:
+            total_count: Current number of stored memories
+            
+        Returns:
+            Dictionary with count, watermark, tag_counts, earliest and latest
+        """
+        try:
+            with open(self._stats_path) as f:
+                aggregate = json.load(f)
+        except (OSError, ValueError):
+            aggregate = None
+        
+        if aggregate is not None:
+            results = self.collection.get(
+                where={"ts_epoch": {"$gt": aggregate["watermark"]}},
+                include=["metadatas"]
+            )
+            if aggregate["count"] + len(results['ids']) != total_count:
+                aggregate = None
+        if aggregate is None:
+            aggregate = self._empty_stats_aggregate()
+            results = self.collection.get(include=["metadatas"])
+        
+        metadatas = results['metadatas'] or []
+        if metadatas:
+            # Count tag frequency in one flattened pass
+            tag_counts = Counter(aggregate["tag_counts"])
+            tag_counts.update(itertools.chain.from_iterable(
+                _decode_tags(metadata.get('tags')) for metadata in metadatas
+            ))
+            aggregate["tag_counts"] = dict(tag_counts)
+            
+            # Get date range in a single pass
+            earliest, latest = aggregate["earliest"], aggregate["latest"]
+            for metadata in metadatas:
+                d = metadata.get('date', '')
+                if d:
+                    if earliest is None or d < earliest:
+                        earliest = d
+                    if latest is None or d > latest:
+                        latest = d
+                aggregate["watermark"] = max(aggregate["watermark"], float(metadata.get('ts_epoch') or 0.0))
+            aggregate["earliest"], aggregate["latest"] = earliest, latest
+            aggregate["count"] += len(metadatas)
+            
+            # Replace atomically so a concurrent reader never sees a partial file
+            tmp_path = f"{self._stats_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(aggregate, f)
+            os.replace(tmp_path, self._stats_path)
+        
+        return aggregate
+    
+    def _extract_tags(self, *texts: str) -> List[str]:
         """
         Extract semantic tags from prompts and analysis.
         
+        Each text is scanned in place for every keyword and category word. No keyword
+        contains a space, so this matches exactly what scanning the space-joined texts
+        would, without building (and lowercasing) the combined copy.
+        
         Args:
-            prompt: Original prompt
-            expanded_prompt: Expanded prompt
-            llm_analysis: LLM analysis
+            texts: Texts to tag, e.g. the original prompt, expanded prompt and LLM analysis
             
         Returns:
             List of extracted tags
         """
-        # Common creative keywords to look for
-        creative_keywords = [
-            # Objects
-            'robot', 'dragon', 'castle', 'forest', 'city', 'mountain', 'ocean', 'space', 'planet',
-            'car', 'ship', 'building', 'tree', 'flower', 'animal', 'bird', 'fish', 'creature',
-            'sword', 'shield', 'crown', 'gem', 'crystal', 'magic', 'spell', 'potion',
-            
-            # Styles
-            'cyberpunk', 'steampunk', 'fantasy', 'sci-fi', 'medieval', 'futuristic', 'vintage',
-            'modern', 'ancient', 'mystical', 'magical', 'dark', 'bright', 'colorful', 'glowing',
-            'metallic', 'wooden', 'stone', 'glass', 'crystal',
-            
-            # Environments
-            'sunset', 'sunrise', 'night', 'day', 'storm', 'rain', 'snow', 'desert', 'jungle',
-            'underwater', 'sky', 'clouds', 'stars', 'moon', 'sun',
-            
-            # Emotions/Moods
-            'peaceful', 'dramatic', 'mysterious', 'epic', 'serene', 'chaotic', 'beautiful',
-            'terrifying', 'majestic', 'elegant', 'powerful', 'delicate'
-        ]
-        
-        # Combine all text
-        all_text = f"{prompt} {expanded_prompt} {llm_analysis}".lower()
-        
-        # Extract matching keywords
-        tags = []
-        for keyword in creative_keywords:
-            if keyword in all_text:
-                tags.append(keyword)
-        
-        # Add some basic categorization
-        if any(word in all_text for word in ['robot', 'cyberpunk', 'futuristic', 'sci-fi']):
-            tags.append('sci-fi')
-        if any(word in all_text for word in ['dragon', 'magic', 'fantasy', 'medieval', 'castle']):
-            tags.append('fantasy')
-        if any(word in all_text for word in ['nature', 'forest', 'tree', 'flower', 'mountain']):
-            tags.append('nature')
-        if any(word in all_text for word in ['city', 'building', 'urban', 'street']):
-            tags.append('urban')
-        
-        # Remove duplicates and limit
-        tags = list(set(tags))[:10]
-        
-        return tags
+        found = set().union(*(_TAG_SCANNER.findall(text) for text in texts))
+        
+        # Extract matching keywords, then add categories derived from the same matches
+        tags = [keyword for keyword in CREATIVE_KEYWORDS if keyword in found]
+        tags.extend(category for category, words in TAG_CATEGORIES.items() if not found.isdisjoint(words))
+        
+        # Remove duplicates (keeping keyword order) and limit
+        return list(dict.fromkeys(tags))[:10]
     
     def find_similar_creations(self, reference_prompt: str, limit: int = 3) -> List[Dict[str, Any]]:
         """
@@ -371,4 +1148,19 @@ class MemoryService:
         Returns:
             List of similar creations
         """
-        return self.search_memories(reference_prompt, limit) 
\ No newline at end of file
+        return self.search_memories(reference_prompt, limit)
+    
+    async def find_similar_creations_async(self, reference_prompt: str, limit: int = 3) -> List[Dict[str, Any]]:
+        """
+        Async variant of :meth:`find_similar_creations`.
+        
+        The search runs in a worker thread so it can overlap with LLM requests.
+        
+        Args:
+            reference_prompt: The prompt to find similar creations for
+            limit: Maximum number of similar creations to return
+            
+        Returns:
+            List of similar creations
+        """
+        return await asyncio.to_thread(self.search_memories, reference_prompt, limit)
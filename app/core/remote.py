@@ -1,8 +1,38 @@
-from typing import Optional, Union
+import json
+from typing import Any, Optional, Union
 
 from openfabric_pysdk.helper import Proxy
+from openfabric_pysdk.helper import proxy as proxy_module
 from openfabric_pysdk.helper.proxy import ExecutionResult
 
+try:
+    import orjson
+except ImportError:  # optional accelerator, the proxy keeps the stdlib encoder
+    orjson = None
+
+
+class _OrjsonCodec:
+    """
+    Stand-in for the ``json`` module the SDK proxy uses to encode request payloads.
+
+    The proxy only calls ``json.dumps`` before compressing the payload, so encoding
+    large inputs (such as base64 images) goes through orjson's SIMD string encoder.
+    Non-string dict keys are coerced like the stdlib does, and anything else orjson
+    rejects is encoded by the stdlib ``json`` module, so every payload that encoded
+    before still does.
+    """
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs) -> str:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            return json.dumps(obj, **kwargs)
+
+
+if orjson is not None:
+    proxy_module.json = _OrjsonCodec
+
 
 class Remote:
     """
@@ -0,0 +1,185 @@
+"""
+Semantic Response Cache
+
+This module provides a small in-process cache that returns previously computed
+LLM results for prompts that are identical or semantically near-identical to an
+earlier one. Lookups first try an exact match on the prompt text and then fall
+back to cosine similarity between prompt embeddings.
+
+Entries are grouped into namespaces (for example one per LLM operation and model)
+so results from different operations never collide. Each namespace keeps its
+embeddings in a single normalized numpy matrix, which keeps similarity lookups to
+one matrix-vector product for the small cache sizes used here (<10k entries).
+
+The similarity threshold can be tuned with the ``SEMCACHE_THRESHOLD`` environment
+variable (defaults to 0.92).
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.92
+
+
+class _Namespace:
+    """LRU-ordered entries of a single namespace plus their stacked embeddings."""
+
+    def __init__(self):
+        self.entries: "OrderedDict[str, Tuple[np.ndarray, Any]]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._keys: Tuple[str, ...] = ()
+
+    def invalidate(self) -> None:
+        self._matrix = None
+
+    def matrix(self) -> Tuple[Tuple[str, ...], np.ndarray]:
+        # Rebuilt lazily after mutations so repeated lookups share one stacked array
+        if self._matrix is None:
+            self._keys = tuple(self.entries.keys())
+            self._matrix = np.stack([vector for vector, _ in self.entries.values()])
+        return self._keys, self._matrix
+
+
+class SemanticCache:
+    """
+    Exact-then-semantic cache for expensive prompt-based computations.
+
+    Attributes:
+        embed_fn (Callable): Function mapping a prompt to its embedding vector
+        threshold (float): Minimum cosine similarity for a semantic cache hit
+        max_entries (int): Maximum entries kept per namespace before LRU eviction
+    """
+
+    def __init__(self,
+                 embed_fn: Callable[[str], Sequence[float]],
+                 threshold: Optional[float] = None,
+                 max_entries: int = 1024):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            embed_fn: Function that returns an embedding for a prompt string
+            threshold: Cosine similarity required for a hit. Defaults to the
+                      ``SEMCACHE_THRESHOLD`` environment variable or 0.92
+            max_entries: Maximum number of entries per namespace
+        """
+        self.embed_fn = embed_fn
+        self.threshold = threshold if threshold is not None else float(
+            os.getenv("SEMCACHE_THRESHOLD", DEFAULT_THRESHOLD)
+        )
+        self.max_entries = max_entries
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.Lock()
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embed_fn(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def lookup(self, namespace: str, text: str) -> Tuple[Optional[Any], Optional[np.ndarray]]:
+        """
+        Look up a cached value for a prompt.
+
+        Args:
+            namespace: Namespace to search in
+            text: Prompt text to look up
+
+        Returns:
+            Tuple of (cached value or None, query embedding or None). The embedding is
+            returned on a semantic miss so callers can pass it back to :meth:`add`.
+        """
+        with self._lock:
+            space = self._namespaces.get(namespace)
+            if space is not None and text in space.entries:
+                space.entries.move_to_end(text)
+                return space.entries[text][1], None
+
+        vector = self._embed(text)
+
+        with self._lock:
+            space = self._namespaces.get(namespace)
+            if space is None or not space.entries:
+                return None, vector
+
+            keys, matrix = space.matrix()
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                key = keys[best]
+                space.entries.move_to_end(key)
+                logging.info(f"Semantic cache hit in '{namespace}' ({scores[best]:.3f} similar)")
+                return space.entries[key][1], vector
+
+        return None, vector
+
+    def add(self, namespace: str, text: str, value: Any, embedding: Optional[np.ndarray] = None) -> None:
+        """
+        Store a value for a prompt, evicting the least recently used entry when full.
+
+        Args:
+            namespace: Namespace to store the value in
+            text: Prompt text the value was computed for
+            value: Value to cache
+            embedding: Precomputed normalized embedding from :meth:`lookup`, if available
+        """
+        vector = embedding if embedding is not None else self._embed(text)
+        with self._lock:
+            space = self._namespaces.setdefault(namespace, _Namespace())
+            space.entries[text] = (vector, value)
+            space.entries.move_to_end(text)
+            while len(space.entries) > self.max_entries:
+                space.entries.popitem(last=False)
+            space.invalidate()
+
+    def get_or_compute(self, namespace: str, text: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for a prompt, computing and storing it on a miss.
+
+        Exceptions raised by ``compute`` propagate and nothing is cached.
+
+        Args:
+            namespace: Namespace for the cached value
+            text: Prompt text used as the cache key
+            compute: Zero-argument callable producing the value on a miss
+
+        Returns:
+            The cached or freshly computed value
+        """
+        value, embedding = self.lookup(namespace, text)
+        if value is not None:
+            return value
+        value = compute()
+        self.add(namespace, text, value, embedding)
+        return value
+
+    async def aget_or_compute(self, namespace: str, text: str, compute: Callable[[], Any]) -> Any:
+        """
+        Async variant of :meth:`get_or_compute` where ``compute`` returns an awaitable.
+
+        Embedding the prompt runs in a worker thread so it never blocks the event loop.
+
+        Args:
+            namespace: Namespace for the cached value
+            text: Prompt text used as the cache key
+            compute: Zero-argument callable returning an awaitable value
+
+        Returns:
+            The cached or freshly computed value
+        """
+        value, embedding = await asyncio.to_thread(self.lookup, namespace, text)
+        if value is not None:
+            return value
+        value = await compute()
+        await asyncio.to_thread(self.add, namespace, text, value, embedding)
+        return value
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._namespaces.clear()
@@ -19,11 +19,16 @@ communicate with Openfabric's text-to-image and image-to-3D applications.
 
 import json
 import logging
-from typing import Any, Dict, List, Literal, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from marshmallow import fields
 
 from core.remote import Remote
+from openfabric_pysdk.fields import Resource
 from openfabric_pysdk.helper import has_resource_fields, json_schema_to_marshmallow, resolve_resources
 from openfabric_pysdk.loader import OutputSchemaInst
 
@@ -31,6 +36,8 @@ from openfabric_pysdk.loader import OutputSchemaInst
 Manifests = Dict[str, dict]  # Maps app IDs to their manifest data
 Schemas = Dict[str, Tuple[dict, dict]]  # Maps app IDs to (input_schema, output_schema) tuples
 Connections = Dict[str, Remote]  # Maps app IDs to their WebSocket Remote connections
+OutputMarshmallows = Dict[str, Tuple[type, bool]]  # Maps app IDs to (output schema class, has resource fields)
+FastResolvers = Dict[str, Callable[[dict], dict]]  # Maps app IDs to resolvers specialized for their output schema
 
 
 class Stub:
@@ -53,6 +60,10 @@ class Stub:
         _schema (Schemas): Dictionary mapping app IDs to their input/output schemas
         _manifest (Manifests): Dictionary mapping app IDs to their manifest metadata
         _connections (Connections): Dictionary mapping app IDs to their Remote connections
+        _marshmallow (OutputMarshmallows): Dictionary mapping app IDs to their compiled
+                                           output schema and whether it has resource fields
+        _fast_resolver (FastResolvers): Dictionary mapping app IDs with flat output schemas
+                                        to resolvers that fetch their resource fields directly
     """
 
     def __init__(self, app_ids: List[str]):
@@ -65,37 +76,110 @@ class Stub:
         3. Establishes a WebSocket connection via Remote class
         4. Stores all information for future use
         
+        Applications are initialized in parallel worker threads that share one pooled
+        HTTPS session, so the three GETs of an application reuse one connection.
+        
         Args:
             app_ids: List of application identifiers (hostnames or URLs)
                     for Openfabric applications to connect to
         """
+        self._app_ids = list(app_ids)
         self._schema: Schemas = {}
         self._manifest: Manifests = {}
         self._connections: Connections = {}
+        self._marshmallow: OutputMarshmallows = {}
+        self._fast_resolver: FastResolvers = {}
 
-        for app_id in app_ids:
-            base_url = app_id.strip('/')
+        pool_size = max(1, len(app_ids))
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size * 4))
 
-            try:
-                # Fetch application manifest containing metadata and capabilities
-                manifest = requests.get(f"https://{base_url}/manifest", timeout=5).json()
-                logging.info(f"[{app_id}] Manifest loaded: {manifest}")
-                self._manifest[app_id] = manifest
+        with ThreadPoolExecutor(max_workers=min(16, pool_size)) as executor:
+            list(executor.map(self._init_app, app_ids))
 
-                # Fetch input schema for request validation
-                input_schema = requests.get(f"https://{base_url}/schema?type=input", timeout=5).json()
-                logging.info(f"[{app_id}] Input schema loaded: {input_schema}")
+    def _init_app(self, app_id: str) -> None:
+        """
+        Load the manifest and schemas of one application and connect to it.
+        
+        Failures are logged and leave the application without a connection.
+        
+        Args:
+            app_id: Application identifier (hostname or URL)
+        """
+        base_url = app_id.strip('/')
+
+        try:
+            # Fetch application manifest containing metadata and capabilities
+            manifest = self._session.get(f"https://{base_url}/manifest", timeout=5).json()
+            logging.info(f"[{app_id}] Manifest loaded: {manifest}")
+            self._manifest[app_id] = manifest
 
-                # Fetch output schema for response validation
-                output_schema = requests.get(f"https://{base_url}/schema?type=output", timeout=5).json()
-                logging.info(f"[{app_id}] Output schema loaded: {output_schema}")
-                self._schema[app_id] = (input_schema, output_schema)
+            # Fetch input schema for request validation
+            input_schema = self._session.get(f"https://{base_url}/schema?type=input", timeout=5).json()
+            logging.info(f"[{app_id}] Input schema loaded: {input_schema}")
 
-                # Establish WebSocket connection for real-time communication
-                self._connections[app_id] = Remote(f"wss://{base_url}/app", f"{app_id}-proxy").connect()
-                logging.info(f"[{app_id}] Connection established.")
-            except Exception as e:
-                logging.error(f"[{app_id}] Initialization failed: {e}")
+            # Fetch output schema for response validation
+            output_schema = self._session.get(f"https://{base_url}/schema?type=output", timeout=5).json()
+            logging.info(f"[{app_id}] Output schema loaded: {output_schema}")
+            self._schema[app_id] = (input_schema, output_schema)
+
+            # Output schemas are immutable per app, so compile them once instead of per call
+            marshmallow = json_schema_to_marshmallow(output_schema)
+            self._marshmallow[app_id] = (marshmallow, has_resource_fields(marshmallow()))
+            resource_keys = self._flat_resource_keys(marshmallow)
+            if resource_keys:
+                self._fast_resolver[app_id] = self._compile_resolver(base_url, resource_keys)
+
+            # Establish WebSocket connection for real-time communication
+            self._connections[app_id] = Remote(f"wss://{base_url}/app", f"{app_id}-proxy").connect()
+            logging.info(f"[{app_id}] Connection established.")
+        except Exception as e:
+            logging.error(f"[{app_id}] Initialization failed: {e}")
+
+    @staticmethod
+    def _flat_resource_keys(marshmallow: type) -> Optional[List[str]]:
+        """
+        Find the resource fields of an output schema that only has top-level resources.
+        
+        Args:
+            marshmallow: Compiled output schema class
+            
+        Returns:
+            Keys of the resource fields, or None if the schema has nested or list fields
+            (which keep the generic ``resolve_resources`` walk)
+        """
+        declared = marshmallow()._declared_fields
+        if any(isinstance(field, (fields.Nested, fields.List, fields.Dict)) for field in declared.values()):
+            return None
+        return [field.data_key or name for name, field in declared.items() if isinstance(field, Resource)]
+
+    def _compile_resolver(self, base_url: str, resource_keys: List[str]) -> Callable[[dict], dict]:
+        """
+        Specialize resource resolution for an output schema with only top-level resources.
+        
+        The generic ``resolve_resources`` walks the schema for every response; the
+        returned closure fetches exactly the known resource keys instead.
+        
+        Args:
+            base_url: Application host the resources are served from
+            resource_keys: Keys of the top-level resource fields
+            
+        Returns:
+            Resolver replacing resource IDs with their content
+        """
+        url = f"https://{base_url}/resource?reid={{reid}}"
+        session = self._session
+        
+        def resolve(result: dict) -> dict:
+            for key in resource_keys:
+                reid = result.get(key)
+                if isinstance(reid, str):
+                    response = session.get(url.format(reid=reid), timeout=60)
+                    response.raise_for_status()
+                    result[key] = response.content
+            return result
+        
+        return resolve
 
     def call(self, app_id: str, data: Any, uid: str = 'super-user') -> dict:
         """
@@ -128,18 +212,28 @@ class Stub:
             result = connection.get_response(handler)
 
             # Handle resource resolution for binary data (images, models, etc.)
-            schema = self.schema(app_id, 'output')
-            marshmallow = json_schema_to_marshmallow(schema)
-            handle_resources = has_resource_fields(marshmallow())
+            marshmallow, handle_resources = self._marshmallow[app_id]
 
             # Resolve any resource URLs to actual binary data
-            if handle_resources:
+            fast_resolver = self._fast_resolver.get(app_id)
+            if fast_resolver is not None:
+                result = fast_resolver(result)
+            elif handle_resources:
                 result = resolve_resources("https://" + app_id + "/resource?reid={reid}", result, marshmallow())
 
             return result
         except Exception as e:
             logging.error(f"[{app_id}] Execution failed: {e}")
 
+    def is_connected(self) -> bool:
+        """
+        Check whether every application of this stub was initialized and connected.
+        
+        Returns:
+            True if no application failed to initialize
+        """
+        return all(app_id in self._connections for app_id in self._app_ids)
+
     def manifest(self, app_id: str) -> dict:
         """
         Retrieve the manifest metadata for a specific application.
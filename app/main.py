@@ -12,33 +12,147 @@ The pipeline includes intelligent memory-aware processing that can detect refere
 to past creations and enhance new prompts based on historical context.
 """
 
+import asyncio
 import logging
-from typing import Dict
-import base64
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
 
+try:
+    import pybase64 as base64  # SIMD base64, drop-in for the stdlib module
+except ImportError:
+    import base64
+
+# Imported first: it sizes the OpenMP/MKL thread pools before any numeric library loads
+from core.memory_service import MemoryService
 from ontology_dc8f06af066e4a7880a5938933236037.config import ConfigClass
 from ontology_dc8f06af066e4a7880a5938933236037.input import InputClass
 from ontology_dc8f06af066e4a7880a5938933236037.output import OutputClass
 from openfabric_pysdk.context import AppModel, State
 from core.stub import Stub
-from core.llm_service import LocalLLMService
-from core.memory_service import MemoryService
+from core.llm_service import LocalLLMService, get_llm_service
+from core.semantic_cache import SemanticCache
 
 # Global configuration storage for user-specific settings
 configurations: Dict[str, ConfigClass] = dict()
 
-# Initialize core services
-# These services handle LLM communication and memory management
-llm_service = LocalLLMService()
-memory_service = MemoryService()
+# Connected stubs reused across requests, keyed by their sorted app IDs
+stubs: Dict[Tuple[str, ...], Stub] = {}
+stubs_lock = threading.Lock()
 
 # Openfabric Application IDs
 # These are the verified working app IDs for the required services
 TEXT_TO_IMAGE_APP_ID = "c25dcd829d134ea98f5ae4dd311d13bc.node3.openfabric.network"  # Text-to-image generation
 IMAGE_TO_3D_APP_ID = "f0b5f319156c4819b9827000b17e511a.node3.openfabric.network"    # Image-to-3D model conversion
 
+# Root directory for generated images and 3D models
+OUTPUT_DIR = "generated_content"
+
+# Result keys that may hold the generated content, in order of preference
+IMAGE_RESULT_KEYS = ('result', 'image', 'output')
+MODEL_RESULT_KEYS = ('result', 'model', 'output', 'mesh', 'generated_object', 'video_object')
+
+
+@lru_cache(maxsize=1)
+def get_services() -> Tuple[MemoryService, LocalLLMService, SemanticCache]:
+    """
+    Create the core services on first use and reuse them for later requests.
+    
+    These services handle LLM communication and memory management. Creating them
+    lazily keeps process start cheap (the memory database and encoder are only
+    opened by the first request, the encoder by the first embedding) and lets a failed initialization surface as an
+    error response instead of an import failure.
+    
+    Returns:
+        Tuple of (memory service, LLM service, prompt cache). The LLM service reuses
+        the memory encoder to key its semantic response cache, which also serves
+        repeated memory reference checks. The prompt cache holds the similar creations
+        found for recently seen prompts, keyed by the normalized prompt text and
+        tagged with the memory count they were found at (see
+        :func:`_similar_creations`).
+    """
+    memory_service = MemoryService()
+    # Every cache embeds through the memory service's cached path, so a prompt is
+    # encoded once per request (and the encoder loads on the first embedding)
+    llm_service = get_llm_service(embedder=memory_service.embed_query)
+    prompt_cache = SemanticCache(memory_service.embed_query, threshold=0.95, max_entries=512)
+    return memory_service, llm_service, prompt_cache
+
+
+def get_stub(app_ids: List[str]) -> Stub:
+    """
+    Return a connected Stub for a set of app IDs, reusing the one from earlier requests.
+    
+    Manifests, schemas and WebSocket connections are then set up once per process
+    instead of per request. A stub whose applications did not all connect is not
+    kept, so the next request retries them.
+    
+    Args:
+        app_ids: Openfabric application IDs the stub must serve
+        
+    Returns:
+        Stub connected to the applications
+    """
+    key = tuple(sorted(app_ids))
+    with stubs_lock:
+        stub = stubs.get(key)
+        if stub is None:
+            stub = Stub(list(key))
+            if stub.is_connected():
+                stubs[key] = stub
+        return stub
+
+
+@lru_cache(maxsize=1)
+def _date_dir(day: str) -> str:
+    """
+    Return the output subdirectory for a day, creating it on the first request of the day.
+    
+    Args:
+        day: Date formatted as YYYY-MM-DD
+        
+    Returns:
+        Path of the day's output directory
+    """
+    date_dir = os.path.join(OUTPUT_DIR, day)
+    os.makedirs(date_dir, exist_ok=True)
+    return date_dir
+
+
+def _write_file(path: str, data: bytes) -> None:
+    """
+    Write binary data to a file.
+
+    Args:
+        path: Destination file path
+        data: Bytes to write
+    """
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _first_value(result: dict, keys: Tuple[str, ...]) -> Any:
+    """
+    Return the value of the first key present in an app result.
+
+    Args:
+        result: Response data from an Openfabric app
+        keys: Candidate keys in order of preference
+
+    Returns:
+        The first non-None value, or None if no key is present
+    """
+    for key in keys:
+        value = result.get(key)
+        if value is not None:
+            return value
+    return None
+
 
 def config(configuration: Dict[str, ConfigClass], state: State) -> None:
     """
@@ -52,350 +166,434 @@ def config(configuration: Dict[str, ConfigClass], state: State) -> None:
         state: Current application state (unused in this implementation)
     """
     for uid, conf in configuration.items():
-        logging.info(f"Saving new config for user with id: '{uid}'")
+        logging.info("Saving new config for user with id: '%s'", uid)
         configurations[uid] = conf
 
 
-def execute(model: AppModel) -> None:
+@dataclass
+class PipelineState:
     """
-    Main execution entry point for the AI Creative Pipeline.
+    Values produced by the pipeline steps for one request.
     
-    This function implements the complete pipeline that takes a user prompt and transforms
-    it through multiple stages to produce both an image and a 3D model, while maintaining
-    memory of past creations for context-aware generation.
+    Each step reads what earlier steps stored and adds its own results; the response
+    message is rendered once from the final state.
+    """
+    user_prompt: str
+    app_ids: List[str]
+    stub: Optional[Stub] = None
+    memory_service: Optional[MemoryService] = None
+    llm_service: Optional[LocalLLMService] = None
+    prompt_cache: Optional[SemanticCache] = None
+    memory_reference: Dict[str, Any] = field(default_factory=dict)
+    similar_creations: List[Dict[str, Any]] = field(default_factory=list)
+    user_analysis: Dict[str, Any] = field(default_factory=dict)
+    expanded_prompt: str = ""
+    timestamp: str = ""
+    date_dir: str = ""
+    image_filename: str = ""
+    image_bytes: Optional[bytes] = None
+    image_base64: Optional[str] = None
+    model_3d_filename_glb: str = ""
+    memory_id: Optional[str] = None
+    failed_step: Optional[str] = None
+    error: Optional[Exception] = None
+
+
+class PipelineAbort(Exception):
+    """Raised by a step to end the pipeline with its message as the response."""
+
+
+def _connect(state: PipelineState) -> None:
+    """Get the Openfabric service stub for the configured app IDs."""
+    logging.info("🔗 Initializing Stub with app IDs: %s", state.app_ids)
+    state.stub = get_stub(state.app_ids)
+
+
+async def _similar_creations(state: PipelineState) -> List[Dict[str, Any]]:
+    """
+    Find the past creations similar to the prompt, reusing an earlier search.
     
-    Pipeline Steps:
-    1. Prompt Analysis: Use local LLM to analyze and enhance the user prompt
-    2. Memory Integration: Check for references to past creations and integrate context
-    3. Image Generation: Create image using enhanced prompt via Openfabric
-    4. 3D Conversion: Convert generated image to 3D model via Openfabric
-    5. Memory Storage: Store the creation for future reference and learning
+    A cached result is only reused while the memory count is unchanged, since any
+    new creation could be among the similar ones; the rest of the cache stays valid.
+    The prompt is embedded in a worker thread so the event loop is never blocked.
+    """
+    memory_service, prompt_cache = state.memory_service, state.prompt_cache
+    key = state.user_prompt.strip().lower()
+    version = await asyncio.to_thread(memory_service.count)
+    cached, embedding = await asyncio.to_thread(prompt_cache.lookup, "similar_creations", key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
     
-    Args:
-        model: AppModel containing request data and response structure
+    creations = await memory_service.find_similar_creations_async(state.user_prompt, limit=5)
+    await asyncio.to_thread(prompt_cache.add, "similar_creations", key, (version, creations), embedding)
+    return creations
+
+
+def _understand_prompt(state: PipelineState) -> None:
     """
-    # Extract user input from the model
-    request: InputClass = model.request
-    user_prompt = request.prompt
+    STEP 1: UNDERSTAND THE USER 🧠
+    
+    Use local LLM (DeepSeek) to interpret and expand prompts, with the context of
+    similar past creations.
+    """
+    logging.info("🧠 Step 1: Understanding user intent with local LLM...")
+    
+    state.memory_service, state.llm_service, state.prompt_cache = get_services()
+    user_prompt, llm_service = state.user_prompt, state.llm_service
+    
+    # Verify LLM service availability
+    if not llm_service.is_available():
+        logging.error("❌ Local LLM service is not available")
+        raise PipelineAbort("Error: Local LLM service is not available. Please ensure Ollama is running with DeepSeek model.")
+    
+    # STEP 1A + 1B: Memory Reference Detection and Semantic Memory Search
+    # Analyze the prompt to detect references to past creations and search for
+    # similar past creations; repeated or near-identical prompts reuse earlier results
+    # The LLM detection and the index search are independent, so they run concurrently
+    async def detect_and_search():
+        return await asyncio.gather(
+            llm_service.detect_memory_reference_async(user_prompt),
+            _similar_creations(state),
+        )
+
+    state.memory_reference, state.similar_creations = llm_service.run(detect_and_search())
+    memory_reference, similar_creations = state.memory_reference, state.similar_creations
+    logging.info("🔍 Memory reference detection: %s", memory_reference)
+    
+    # Log LLM reasoning for debugging and transparency
+    if memory_reference.get('explanation'):
+        logging.info("🔍 LLM reasoning: %s", memory_reference['explanation'])
+    
+    if similar_creations:
+        logging.info("📚 Found %s similar past creations for context", len(similar_creations))
+        # Per-creation lines are only built when INFO records are actually emitted
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            for i, creation in enumerate(similar_creations, 1):
+                similarity = creation.get('similarity', 0)
+                logging.info("  %s. \"%s\" (%.1f%% similar)", i, creation['prompt'], similarity * 100)
+    else:
+        logging.info("📚 No similar past creations found")
+    
+    # STEP 1C: Context-Aware Prompt Processing
+    # Choose processing method based on available memory context
+    # Intent analysis and expansion are answered by one fused LLM request
+    if similar_creations or memory_reference['has_memory_reference']:
+        logging.info("🧠 Using memory-aware intent analysis and prompt expansion...")
+        state.user_analysis, state.expanded_prompt = llm_service.run(
+            llm_service.analyze_and_expand_async(user_prompt, similar_creations)
+        )
+    else:
+        logging.info("🧠 Using standard intent analysis and prompt expansion...")
+        state.user_analysis, state.expanded_prompt = llm_service.run(
+            llm_service.analyze_and_expand_async(user_prompt)
+        )
+    
+    logging.info("📊 User intent analysis: %s", state.user_analysis)
+    logging.info("✨ Expanded prompt: %s", state.expanded_prompt)
+    logging.info("✅ Step 1 completed successfully!")
 
-    logging.info(f"Starting AI pipeline for prompt: '{user_prompt}'")
 
-    # Retrieve or create user configuration
-    user_config: ConfigClass = configurations.get('super-user', None)
-    if not user_config:
-        # Create default configuration with verified app IDs
-        user_config = ConfigClass()
-        user_config.app_ids = [TEXT_TO_IMAGE_APP_ID, IMAGE_TO_3D_APP_ID]
+def _generate_image(state: PipelineState) -> None:
+    """
+    STEP 2: TEXT TO IMAGE 🎨
     
-    logging.info(f"User config: {user_config}")
+    Use the Openfabric Text-to-Image app on the expanded prompt.
+    """
+    logging.info("🎨 Step 2: Generating image from expanded prompt...")
+    
+    # Use the working text-to-image app ID
+    logging.info("🔗 Using Text-to-Image app: %s", TEXT_TO_IMAGE_APP_ID)
+    
+    # Call the text-to-image service with the enhanced prompt
+    image_result = state.stub.call(TEXT_TO_IMAGE_APP_ID, {'prompt': state.expanded_prompt}, 'super-user')
+    logging.info("📸 Image generation result keys: %s", image_result.keys() if image_result else 'None')
+    
+    if not image_result:
+        raise Exception("No result from Text-to-Image app")
+    
+    # Extract the image data (this might be in different formats - base64, bytes, etc.)
+    image_data = _first_value(image_result, IMAGE_RESULT_KEYS)
+    
+    if not image_data:
+        raise Exception("No image data found in result")
+    
+    # Create organized file structure for generated content
+    now = datetime.now()
+    state.timestamp = now.strftime("%Y%m%d_%H%M%S")
+    
+    # Date-based subdirectory of the output directory for better organization
+    state.date_dir = _date_dir(now.strftime("%Y-%m-%d"))
+    
+    state.image_filename = os.path.join(state.date_dir, f"image_{state.timestamp}.png")
+    
+    # Handle different image data formats that the API might return.
+    # The decoded bytes are kept in memory for Step 3.
+    if isinstance(image_data, bytes):
+        # Direct binary data - save as is
+        state.image_bytes = image_data
+    elif isinstance(image_data, str):
+        # May be base64 encoded or raw string; a base64 payload is passed on to Step 3 as is
+        try:
+            state.image_bytes = base64.b64decode(image_data)
+            state.image_base64 = image_data
+        except:
+            # If not base64, save as text file for debugging
+            with open(f"{state.image_filename}.txt", 'w') as f:
+                f.write(str(image_data))
+    
+    if state.image_bytes is not None:
+        # Written here so a failed write is a Step 2 failure, before the 3D call runs
+        _write_file(state.image_filename, state.image_bytes)
+        logging.info("💾 Image saved as: %s", state.image_filename)
+    logging.info("✅ Step 2 completed successfully!")
 
-    # Initialize Openfabric service stub with configured app IDs
-    app_ids = user_config.app_ids if user_config.app_ids else [TEXT_TO_IMAGE_APP_ID, IMAGE_TO_3D_APP_ID]
-    logging.info(f"🔗 Initializing Stub with app IDs: {app_ids}")
+
+def _convert_to_3d(state: PipelineState) -> None:
+    """
+    STEP 3: IMAGE-TO-3D MODEL CONVERSION
+    
+    Convert the generated image into a 3D model using Openfabric.
+    """
+    logging.info("Step 3: Converting image to 3D model...")
+    
+    # Use the verified image-to-3D application ID
+    logging.info("Using Image-to-3D app: %s", IMAGE_TO_3D_APP_ID)
+    
+    if state.image_bytes is None:
+        raise Exception("Generated image data could not be decoded")
+    
+    # Encode the in-memory image as base64 for JSON serialization, unless it arrived that way
+    image_base64 = state.image_base64 or base64.b64encode(state.image_bytes).decode('utf-8')
+    
+    # Call the image-to-3D service with the generated image
+    # Note: The exact input format may need adjustment based on the app's schema
+    model_3d_result = state.stub.call(IMAGE_TO_3D_APP_ID, {'input_image': image_base64}, 'super-user')
+    
+    logging.info("3D model generation result keys: %s", model_3d_result.keys() if model_3d_result else 'None')
+    
+    if not model_3d_result:
+        raise Exception("No result from Image-to-3D app")
+    
+    # Extract 3D model data from the service response
+    # The response format may vary, so we check multiple possible keys
+    model_3d_data = _first_value(model_3d_result, MODEL_RESULT_KEYS)
+    
+    if not model_3d_data:
+        raise Exception("No 3D model data found in result")
     
+    # Save the 3D model in GLB format (glTF Binary)
+    state.model_3d_filename_glb = os.path.join(state.date_dir, f"model_{state.timestamp}.glb")
+    
+    # Handle different 3D model data formats that the API might return.
+    model_bytes = None
+    if isinstance(model_3d_data, bytes):
+        # Direct binary data - save as GLB file
+        model_bytes = model_3d_data
+    elif isinstance(model_3d_data, str):
+        # May be base64 encoded or raw model data
+        try:
+            model_bytes = base64.b64decode(model_3d_data)
+        except:
+            # If not base64, save as text with GLB extension
+            # Note: The API typically returns GLB format
+            with open(state.model_3d_filename_glb, 'w') as f:
+                f.write(str(model_3d_data))
+    
+    if model_bytes is not None:
+        # Written here so a failed write is a Step 3 failure: the model must be on
+        # disk before it is recorded in memory or reported
+        _write_file(state.model_3d_filename_glb, model_bytes)
+    logging.info("3D model saved as: %s", state.model_3d_filename_glb)
+    logging.info("Step 3 completed successfully!")
+
+
+def _store_memory(state: PipelineState) -> None:
+    """
+    STEP 4: MEMORY STORAGE AND SIMILARITY ANALYSIS
+    
+    Store this creation in memory for future context-aware generation. A failed store
+    only leaves ``memory_id`` unset; the creation itself is still reported.
+    """
+    logging.info("Step 4: Storing creation in memory...")
+    
+    # Store the creation in the memory system for future reference
+    logging.info("Memory System: Storing creation in memory...")
     try:
-        stub = Stub(app_ids)
+        state.memory_id = state.memory_service.store_creation_now(
+            prompt=state.user_prompt,
+            expanded_prompt=state.expanded_prompt,
+            llm_analysis=state.user_analysis.get('analysis', ''),
+            image_file=state.image_filename,
+            model_file=state.model_3d_filename_glb,
+            execution_id=uuid.uuid4().hex  # Unique across requests, processes and restarts
+        )
         
+        if state.memory_id:
+            logging.info("Memory stored with ID: %s", state.memory_id)
+            
+            # We already found similar creations in Step 1, so use those results
+            if state.similar_creations:
+                logging.info("Found %s similar past creations (from Step 1)", len(state.similar_creations))
+                if logging.getLogger().isEnabledFor(logging.INFO):
+                    for i, creation in enumerate(state.similar_creations, 1):
+                        similarity = creation.get('similarity', 0)
+                        prompt = creation.get('prompt', 'Unknown prompt')
+                        logging.info("  %s. \"%s\" (%.1f%% similar)", i, prompt, similarity * 100)
+            else:
+                logging.info("No similar past creations found")
+
     except Exception as e:
-        logging.error(f"❌ Failed to initialize Stub: {e}")
-        response: OutputClass = model.response
-        response.message = f"Error: Failed to connect to Openfabric apps: {str(e)}"
-        return
+        logging.error("Memory storage failed: %s", e)
+        state.memory_id = None
 
-    # ------------------------------
-    # STEP 1: UNDERSTAND THE USER 🧠
-    # Use local LLM (DeepSeek) to interpret and expand prompts
-    # ------------------------------
 
-    try:
-        logging.info("🧠 Step 1: Understanding user intent with local LLM...")
-        
-        # Verify LLM service availability
-        if not llm_service.is_available():
-            logging.error("❌ Local LLM service is not available")
-            response: OutputClass = model.response
-            response.message = "Error: Local LLM service is not available. Please ensure Ollama is running with DeepSeek model."
-            return
-        
-        # STEP 1A: Memory Reference Detection
-        # Analyze the prompt to detect references to past creations
-        memory_reference = llm_service.detect_memory_reference(user_prompt)
-        logging.info(f"🔍 Memory reference detection: {memory_reference}")
-        
-        # Log LLM reasoning for debugging and transparency
-        if memory_reference.get('explanation'):
-            logging.info(f"🔍 LLM reasoning: {memory_reference['explanation']}")
-        
-        # STEP 1B: Semantic Memory Search
-        # Search for similar past creations to provide context
-        similar_creations = memory_service.find_similar_creations(user_prompt, limit=5)
+# Pipeline steps in order, with the log message used when a step fails
+PIPELINE_STEPS: Tuple[Tuple[str, Callable[[PipelineState], None], str], ...] = (
+    ("connect", _connect, "❌ Failed to initialize Stub: %s"),
+    ("step1", _understand_prompt, "❌ Error in Step 1: %s"),
+    ("step2", _generate_image, "Error in Step 2: %s"),
+    ("step3", _convert_to_3d, "Error in Step 3: %s"),
+    ("step4", _store_memory, "Error in Step 4: %s"),
+)
+
+
+# Step heading, error label and service name reported when Step 2 or 3 fails
+GENERATION_FAILURES = {
+    "step2": ("Step 2", "Image Generation", "Text-to-Image"),
+    "step3": ("Step 3", "Image-to-3D Conversion", "Image-to-3D"),
+}
+
+
+def _render_success(state: PipelineState) -> str:
+    """Build the response message of a completed pipeline run."""
+    memory_reference, similar_creations = state.memory_reference, state.similar_creations
+    memory_text = ""
+    memory_awareness_text = ""
+    
+    # Add memory reference detection information
+    if memory_reference.get('has_memory_reference'):
+        memory_awareness_text = f"\nMemory Reference Detected: {memory_reference.get('explanation', 'LLM detected reference to past creations')}"
+        if memory_reference.get('reference_type') and memory_reference['reference_type'] != 'none':
+            memory_awareness_text += f" (Type: {memory_reference['reference_type']})"
+    
+    # Add memory storage results
+    if state.memory_id:
+        memory_text = f"\nMemory System: Creation stored for future recall (ID: {state.memory_id})"
         if similar_creations:
-            logging.info(f"📚 Found {len(similar_creations)} similar past creations for context")
-            for i, creation in enumerate(similar_creations, 1):
+            memory_text += f"\nSimilar past creations found: {len(similar_creations)} matches"
+            for i, creation in enumerate(similar_creations[:3], 1):  # Show top 3 matches
                 similarity = creation.get('similarity', 0)
-                logging.info(f"  {i}. \"{creation['prompt']}\" ({similarity:.1%} similar)")
-        else:
-            logging.info("📚 No similar past creations found")
-        
-        # STEP 1C: Context-Aware Prompt Processing
-        # Choose processing method based on available memory context
-        if similar_creations or memory_reference['has_memory_reference']:
-            logging.info("🧠 Using memory-aware intent analysis...")
-            user_analysis = llm_service.interpret_memory_aware_intent(user_prompt, similar_creations)
-            
-            # Use memory-aware prompt expansion
-            logging.info("✨ Using memory-aware prompt expansion...")
-            expanded_prompt = llm_service.expand_prompt_with_memory(user_prompt, similar_creations)
+                memory_text += f"\n   {i}. \"{creation['prompt']}\" ({similarity:.1%} similar)"
         else:
-            logging.info("🧠 Using standard intent analysis...")
-            user_analysis = llm_service.interpret_user_intent(user_prompt)
-            expanded_prompt = llm_service.expand_prompt(user_prompt)
-        
-        logging.info(f"📊 User intent analysis: {user_analysis}")
-        logging.info(f"✨ Expanded prompt: {expanded_prompt}")
-        logging.info("✅ Step 1 completed successfully!")
-        
-    except Exception as e:
-        logging.error(f"❌ Error in Step 1: {e}")
-        response: OutputClass = model.response
-        response.message = f"Error in Step 1 (LLM Processing): {str(e)}"
-        return
-
-    # ------------------------------
-    # STEP 2: TEXT TO IMAGE 🎨
-    # Use Openfabric Text-to-Image app
-    # ------------------------------
+            memory_text += "\nNo similar past creations found (this might be your first creation with this theme)"
+    
+    return f"""AI Pipeline Complete Success!
 
-    try:
-        logging.info("🎨 Step 2: Generating image from expanded prompt...")
-        
-        # Use the working text-to-image app ID
-        logging.info(f"🔗 Using Text-to-Image app: {TEXT_TO_IMAGE_APP_ID}")
-        
-        # Call the text-to-image service with the enhanced prompt
-        image_result = stub.call(TEXT_TO_IMAGE_APP_ID, {'prompt': expanded_prompt}, 'super-user')
-        logging.info(f"📸 Image generation result keys: {image_result.keys() if image_result else 'None'}")
-        
-        if not image_result:
-            raise Exception("No result from Text-to-Image app")
-        
-        # Extract the image data (this might be in different formats - base64, bytes, etc.)
-        image_data = None
-        if 'result' in image_result:
-            image_data = image_result['result']
-        elif 'image' in image_result:
-            image_data = image_result['image']
-        elif 'output' in image_result:
-            image_data = image_result['output']
-        
-        if not image_data:
-            raise Exception("No image data found in result")
-        
-        # Create organized file structure for generated content
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Create organized output directory structure
-        output_dir = "generated_content"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Create date-based subdirectory for better organization
-        date_dir = os.path.join(output_dir, datetime.now().strftime("%Y-%m-%d"))
-        os.makedirs(date_dir, exist_ok=True)
-        
-        image_filename = os.path.join(date_dir, f"image_{timestamp}.png")
-        
-        # Handle different image data formats that the API might return
-        if isinstance(image_data, bytes):
-            # Direct binary data - save as is
-            with open(image_filename, 'wb') as f:
-                f.write(image_data)
-        elif isinstance(image_data, str):
-            # May be base64 encoded or raw string
-            try:
-                image_bytes = base64.b64decode(image_data)
-                with open(image_filename, 'wb') as f:
-                    f.write(image_bytes)
-            except:
-                # If not base64, save as text file for debugging
-                with open(f"{image_filename}.txt", 'w') as f:
-                    f.write(str(image_data))
-        
-        logging.info(f"💾 Image saved as: {image_filename}")
-        logging.info("✅ Step 2 completed successfully!")
-        
-        # STEP 3: IMAGE-TO-3D MODEL CONVERSION
-        # Convert the generated image into a 3D model using Openfabric
-        try:
-            logging.info("Step 3: Converting image to 3D model...")
-            
-            # Use the verified image-to-3D application ID
-            logging.info(f"Using Image-to-3D app: {IMAGE_TO_3D_APP_ID}")
-            
-            # Read the generated image to send to the 3D conversion service
-            with open(image_filename, 'rb') as f:
-                image_bytes = f.read()
-            
-            # Encode image as base64 for JSON serialization
-            image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-            
-            # Call the image-to-3D service with the generated image
-            # Note: The exact input format may need adjustment based on the app's schema
-            model_3d_result = stub.call(IMAGE_TO_3D_APP_ID, {'input_image': image_base64}, 'super-user')
-            logging.info(f"3D model generation result keys: {model_3d_result.keys() if model_3d_result else 'None'}")
-            
-            if not model_3d_result:
-                raise Exception("No result from Image-to-3D app")
-            
-            # Extract 3D model data from the service response
-            # The response format may vary, so we check multiple possible keys
-            model_3d_data = None
-            if 'result' in model_3d_result:
-                model_3d_data = model_3d_result['result']
-            elif 'model' in model_3d_result:
-                model_3d_data = model_3d_result['model']
-            elif 'output' in model_3d_result:
-                model_3d_data = model_3d_result['output']
-            elif 'mesh' in model_3d_result:
-                model_3d_data = model_3d_result['mesh']
-            elif 'generated_object' in model_3d_result:
-                model_3d_data = model_3d_result['generated_object']
-            elif 'video_object' in model_3d_result:
-                model_3d_data = model_3d_result['video_object']
-            
-            if not model_3d_data:
-                raise Exception("No 3D model data found in result")
-            
-            # Save the 3D model in GLB format (glTF Binary)
-            model_3d_filename_glb = os.path.join(date_dir, f"model_{timestamp}.glb")
-            
-            # Handle different 3D model data formats that the API might return
-            if isinstance(model_3d_data, bytes):
-                # Direct binary data - save as GLB file
-                with open(model_3d_filename_glb, 'wb') as f:
-                    f.write(model_3d_data)
-            elif isinstance(model_3d_data, str):
-                # May be base64 encoded or raw model data
-                try:
-                    model_bytes = base64.b64decode(model_3d_data)
-                    # Save as GLB format (binary)
-                    with open(model_3d_filename_glb, 'wb') as f:
-                        f.write(model_bytes)
-                except:
-                    # If not base64, save as text with GLB extension
-                    # Note: The API typically returns GLB format
-                    with open(model_3d_filename_glb, 'w') as f:
-                        f.write(str(model_3d_data))
-            
-            logging.info(f"3D model saved as: {model_3d_filename_glb}")
-            logging.info("Step 3 completed successfully!")
-            
-            # STEP 4: MEMORY STORAGE AND SIMILARITY ANALYSIS
-            # Store this creation in memory for future context-aware generation
-            try:
-                logging.info("Step 4: Storing creation in memory...")
-                
-                # Store the creation in the memory system for future reference
-                logging.info("Memory System: Storing creation in memory...")
-                try:
-                    memory_id = memory_service.store_creation(
-                        prompt=user_prompt,
-                        expanded_prompt=expanded_prompt,
-                        llm_analysis=user_analysis.get('analysis', ''),
-                        image_file=image_filename,
-                        model_file=model_3d_filename_glb,
-                        execution_id=str(id(model))  # Use model object ID as unique execution ID
-                    )
-                    
-                    if memory_id:
-                        logging.info(f"Memory stored with ID: {memory_id}")
-                        
-                        # We already found similar creations in Step 1, so use those results
-                        if similar_creations:
-                            logging.info(f"Found {len(similar_creations)} similar past creations (from Step 1)")
-                            for i, creation in enumerate(similar_creations, 1):
-                                similarity = creation.get('similarity', 0)
-                                prompt = creation.get('prompt', 'Unknown prompt')
-                                logging.info(f"  {i}. \"{prompt}\" ({similarity:.1%} similar)")
-                        else:
-                            logging.info("No similar past creations found")
-
-                except Exception as e:
-                    logging.error(f"Memory storage failed: {e}")
-                    memory_id = None
-
-                # Prepare comprehensive response with memory awareness
-                memory_text = ""
-                memory_awareness_text = ""
-                
-                # Add memory reference detection information
-                if memory_reference.get('has_memory_reference'):
-                    memory_awareness_text = f"\nMemory Reference Detected: {memory_reference.get('explanation', 'LLM detected reference to past creations')}"
-                    if memory_reference.get('reference_type') and memory_reference['reference_type'] != 'none':
-                        memory_awareness_text += f" (Type: {memory_reference['reference_type']})"
-                
-                # Add memory storage results
-                if memory_id:
-                    memory_text = f"\nMemory System: Creation stored for future recall (ID: {memory_id})"
-                    if similar_creations:
-                        memory_text += f"\nSimilar past creations found: {len(similar_creations)} matches"
-                        for i, creation in enumerate(similar_creations[:3], 1):  # Show top 3 matches
-                            similarity = creation.get('similarity', 0)
-                            memory_text += f"\n   {i}. \"{creation['prompt']}\" ({similarity:.1%} similar)"
-                    else:
-                        memory_text += "\nNo similar past creations found (this might be your first creation with this theme)"
-
-                # Prepare final success response with all pipeline results
-                response: OutputClass = model.response
-                response.message = f"""AI Pipeline Complete Success!
-
-Original Prompt: {user_prompt}
+Original Prompt: {state.user_prompt}
 {memory_awareness_text}
-Expanded Prompt: {expanded_prompt}
-LLM Analysis: {user_analysis.get('analysis', 'No analysis available')}
+Expanded Prompt: {state.expanded_prompt}
+LLM Analysis: {state.user_analysis.get('analysis', 'No analysis available')}
 
-Step 1 Complete: Image generated and saved to: {image_filename}
-Step 2 Complete: 3D Model generated and saved to: {model_3d_filename_glb}
-Step 3 Complete: GLB format saved to: {model_3d_filename_glb}
+Step 1 Complete: Image generated and saved to: {state.image_filename}
+Step 2 Complete: 3D Model generated and saved to: {state.model_3d_filename_glb}
+Step 3 Complete: GLB format saved to: {state.model_3d_filename_glb}
 {memory_text}
 
 All pipeline steps completed successfully!
-Files saved in: {date_dir}
+Files saved in: {state.date_dir}
 Ready for the next creation!
 """
 
-            except Exception as e:
-                logging.error(f"Error in Step 4: {e}")
-                similar_info = "\n\nWarning: Memory system error, but creation was successful"
-            
-        except Exception as e:
-            logging.error(f"Error in Step 3: {e}")
-            # Still return Step 1 results even if Step 3 fails
-            response: OutputClass = model.response
-            response.message = f"""AI Pipeline - Step 1 Complete, Step 3 Failed
 
-Original Prompt: {user_prompt}
+def _render_response(state: PipelineState) -> str:
+    """
+    Build the response message from the final pipeline state.
+    
+    Args:
+        state: State after the last step that ran
+        
+    Returns:
+        The success message, or the message for the step that failed
+    """
+    error = state.error
+    if isinstance(error, PipelineAbort):
+        return str(error)
+    if state.failed_step == "connect":
+        return f"Error: Failed to connect to Openfabric apps: {str(error)}"
+    if state.failed_step == "step1":
+        return f"Error in Step 1 (LLM Processing): {str(error)}"
+    if state.failed_step in GENERATION_FAILURES:
+        # Still return Step 1 results even if image or 3D generation fails
+        failed, label, service = GENERATION_FAILURES[state.failed_step]
+        return f"""AI Pipeline - Step 1 Complete, {failed} Failed
 
-LLM Analysis: {user_analysis.get('analysis', 'No analysis available')}
+Original Prompt: {state.user_prompt}
 
-Expanded Prompt: {expanded_prompt}
+LLM Analysis: {state.user_analysis.get('analysis', 'No analysis available')}
 
-Image-to-3D Conversion Error: {str(e)}
+Expanded Prompt: {state.expanded_prompt}
 
-Note: Step 1 (LLM) completed successfully, but Step 3 (Image-to-3D) failed."""
-            return
-    except Exception as e:
-        logging.error(f"Error in Step 2: {e}")
-        # Still return Step 1 results even if Step 2 fails
-        response: OutputClass = model.response
-        response.message = f"""AI Pipeline - Step 1 Complete, Step 2 Failed
+{label} Error: {str(error)}
+
+Note: Step 1 (LLM) completed successfully, but {failed} ({service}) failed."""
+    
+    message = _render_success(state)
+    if state.failed_step == "step4":
+        message += "\n\nWarning: Memory system error, but creation was successful"
+    return message
 
-Original Prompt: {user_prompt}
 
-LLM Analysis: {user_analysis.get('analysis', 'No analysis available')}
+def execute(model: AppModel) -> None:
+    """
+    Main execution entry point for the AI Creative Pipeline.
+    
+    This function implements the complete pipeline that takes a user prompt and transforms
+    it through multiple stages to produce both an image and a 3D model, while maintaining
+    memory of past creations for context-aware generation.
+    
+    Pipeline Steps:
+    1. Prompt Analysis: Use local LLM to analyze and enhance the user prompt
+    2. Memory Integration: Check for references to past creations and integrate context
+    3. Image Generation: Create image using enhanced prompt via Openfabric
+    4. 3D Conversion: Convert generated image to 3D model via Openfabric
+    5. Memory Storage: Store the creation for future reference and learning
+    
+    The steps in ``PIPELINE_STEPS`` run in order on a shared :class:`PipelineState`
+    until one fails; the response is then rendered once from that state.
+    
+    Args:
+        model: AppModel containing request data and response structure
+    """
+    # Extract user input from the model
+    request: InputClass = model.request
+    user_prompt = request.prompt
 
-Expanded Prompt: {expanded_prompt}
+    logging.info("Starting AI pipeline for prompt: '%s'", user_prompt)
 
-Image Generation Error: {str(e)}
+    # Retrieve or create user configuration
+    user_config: ConfigClass = configurations.get('super-user', None)
+    if not user_config:
+        # Create default configuration with verified app IDs
+        user_config = ConfigClass()
+        user_config.app_ids = [TEXT_TO_IMAGE_APP_ID, IMAGE_TO_3D_APP_ID]
+    
+    logging.info("User config: %s", user_config)
 
-Note: Step 1 (LLM) completed successfully, but Step 2 (Text-to-Image) failed."""
-        return
\ No newline at end of file
+    # Openfabric service stub app IDs from the configuration
+    app_ids = user_config.app_ids if user_config.app_ids else [TEXT_TO_IMAGE_APP_ID, IMAGE_TO_3D_APP_ID]
+    state = PipelineState(user_prompt=user_prompt, app_ids=app_ids)
+    
+    for name, step, error_log in PIPELINE_STEPS:
+        started = time.perf_counter()
+        try:
+            step(state)
+        except Exception as e:
+            if not isinstance(e, PipelineAbort):
+                logging.error(error_log, e)
+            state.failed_step, state.error = name, e
+            break
+        finally:
+            logging.info("⏱️ %s took %.2fs", name, time.perf_counter() - started)
+    
+    response: OutputClass = model.response
+    response.message = _render_response(state)
@@ -13,12 +13,13 @@ Features demonstrated:
 • Memory-driven creative generation
 """
 
+import asyncio
 import sys
 import os
 sys.path.append('app')
 
 from core.memory_service import MemoryService
-from core.llm_service import LocalLLMService
+from core.llm_service import get_llm_service
 
 def print_header(title, char="="):
     """Print a formatted header"""
@@ -38,7 +39,7 @@ def main():
     
     # Initialize services with correct memory path
     memory_service = MemoryService(persist_directory="app/datastore/memory")
-    llm_service = LocalLLMService()
+    llm_service = get_llm_service()
     
     # ===========================================
     # MEMORY SYSTEM STATUS
@@ -76,13 +77,31 @@ def main():
         }
     ]
     
+    search_categories = [
+        ("toy car", "Vehicles & Transportation"),
+        ("cat", "Animals & Pets"),
+        ("apple fruit", "Food & Natural Objects")
+    ]
+    
+    # Embed every scenario prompt and search term in one encoder batch on a worker
+    # thread while the memory reference checks run concurrently against the LLM
+    queries = [scenario['prompt'] for scenario in test_scenarios] + [term for term, _ in search_categories]
+    
+    async def analyze_all():
+        return await asyncio.gather(
+            asyncio.to_thread(memory_service.search_memories_batch, queries, 3),
+            *(llm_service.detect_memory_reference_async(scenario['prompt']) for scenario in test_scenarios)
+        )
+    
+    search_results, *memory_refs = llm_service.run(analyze_all())
+    
     for i, scenario in enumerate(test_scenarios, 1):
         print(f"\n🎯 Test {i}: {scenario['name']}")
         print(f"   📝 Prompt: \"{scenario['prompt']}\"")
         print(f"   🎪 Purpose: {scenario['description']}")
         
         # Memory reference detection
-        memory_ref = llm_service.detect_memory_reference(scenario['prompt'])
+        memory_ref = memory_refs[i - 1]
         ref_status = "✅ DETECTED" if memory_ref['has_memory_reference'] else "❌ None"
         print(f"   🧠 Memory Reference: {ref_status}")
         
@@ -92,7 +111,7 @@ def main():
                 print(f"      └─ Type: {memory_ref['reference_type']}")
         
         # Similar memory search
-        similar_memories = memory_service.search_memories(scenario['prompt'], limit=3)
+        similar_memories = search_results[i - 1]
         print(f"   🔍 Similar Memories: {len(similar_memories)} found")
         
         if similar_memories:
@@ -112,17 +131,9 @@ def main():
     # ===========================================
     print_section("🔎 SEMANTIC MEMORY SEARCH CAPABILITIES")
     
-    search_categories = [
-        ("toy car", "Vehicles & Transportation"),
-        ("cat", "Animals & Pets"),
-        ("apple fruit", "Food & Natural Objects")
-    ]
-    
-    for search_term, category in search_categories:
+    for (search_term, category), results in zip(search_categories, search_results[len(test_scenarios):]):
         print(f"\n🏷️  Category: {category}")
         print(f"   🔍 Search Term: \"{search_term}\"")
-        
-        results = memory_service.search_memories(search_term, limit=3)
         print(f"   📊 Results Found: {len(results)}")
         
         for j, result in enumerate(results, 1):
@@ -26,27 +26,71 @@ Requirements:
 
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-import base64
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os
+import re
+import shutil
 from pathlib import Path
+from urllib.parse import quote
 import ast
 from streamlit_stl import stl_from_file
 import streamlit.components.v1 as components
 from streamlit_file_browser import st_file_browser
 
-# Configure Streamlit page with metadata and layout settings
-st.set_page_config(
-    page_title="AI Creative Pipeline",
-    page_icon="🎨",
-    layout="wide",
-    initial_sidebar_state="expanded"
+try:
+    from streamlit_file_browser import ensure_tree_cache
+except ImportError:  # older releases always rebuild the listing
+    ensure_tree_cache = None
+
+# File types the pipeline produces; the browser and file count cover images and GLB models
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+MODEL_EXTENSIONS = ('.glb', '.obj')
+BROWSABLE_EXTENSIONS = IMAGE_EXTENSIONS + ('.glb',)
+GENERATED_EXTENSIONS = frozenset(extension[1:] for extension in BROWSABLE_EXTENSIONS)
+
+# Largest response body that parse_response will hand to ast.literal_eval
+LITERAL_EVAL_LIMIT = 1_000_000
+
+# Seconds into a generation request at which each stage typically starts, with the
+# progress shown for it
+GENERATION_STAGES = (
+    (0, 15, "🧠 Analyzing prompt..."),
+    (4, 30, "✨ Enhancing prompt with AI..."),
+    (8, 50, "🎨 Generating image..."),
+    (30, 85, "🎭 Converting to 3D model..."),
 )
 
-# Application header with branding and description
-st.markdown("""
+# Follow-up example per subject of a past creation, in priority order. A subject
+# without an example still ends the search for one.
+MEMORY_EXAMPLES = {
+    'robot': "Make a robot like the one I created before, but with wings",
+    'dragon': "Create a dragon similar to my last one, but this time in a forest",
+    'city': "Generate a city like my previous creation, but during sunrise",
+    'crystal': None,
+}
+MEMORY_EXAMPLE_KEYWORDS = frozenset(MEMORY_EXAMPLES)
+
+# Fields of the pipeline's success message, matched in one pass over the message.
+# The emoji before the section titles are optional since the server may omit them.
+MESSAGE_FIELDS = re.compile(
+    r"Expanded Prompt:(?P<expanded>.*?)(?:🧠\s*)?LLM Analysis:"
+    r"|Memory Reference Detected:(?P<reference>[^\n]+)"
+    r"|Similar past creations found:\s*(?P<count>\d+)"
+    r"|^[ \t]+(?P<listed>\d+\.[^\n]+)"
+    r"|Image saved as:(?P<image>[^\n]+)"
+    r"|3D model saved as:(?P<model>[^\n]+)"
+    r"|(?P<path>[^\s:]*generated_content/\S+\.(?:png|jpg|jpeg|glb|obj))",
+    re.S | re.M
+)
+THINK_BLOCK = re.compile(r"<think>.*?</think>", re.S)
+
+# Page header, built once at import rather than on every rerun
+HEADER_HTML = """
 <div style="
     background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
     padding: 2rem 1rem;
@@ -69,7 +113,55 @@ st.markdown("""
         font-weight: 300;
     ">Transform your ideas into stunning visuals and interactive 3D models</p>
 </div>
-""", unsafe_allow_html=True)
+"""
+
+MODEL_VIEWER_SCRIPT = "https://ajax.googleapis.com/ajax/libs/model-viewer/3.3.0/model-viewer.min.js"
+
+# Warms the browser cache with the viewer script before the first viewer iframe
+# asks for it; crossorigin matches the CORS mode of the module script request
+MODEL_VIEWER_PRELOAD_HTML = (
+    '<link rel="dns-prefetch" href="//ajax.googleapis.com">'
+    f'<link rel="preload" as="script" href="{MODEL_VIEWER_SCRIPT}" crossorigin>'
+)
+
+# Page for one <model-viewer>; filled in with the viewer height and the model URL
+MODEL_VIEWER_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <script type="module" src="{script}"></script>
+    <style>
+        model-viewer {{
+            width: 100%;
+            height: {height}px;
+            background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
+            border-radius: 8px;
+        }}
+    </style>
+</head>
+<body>
+    <model-viewer
+        src="{url}"
+        alt="3D Model"
+        auto-rotate
+        camera-controls
+        loading="eager">
+    </model-viewer>
+</body>
+</html>
+"""
+
+# Configure Streamlit page with metadata and layout settings
+st.set_page_config(
+    page_title="AI Creative Pipeline",
+    page_icon="🎨",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Application header with branding and description
+st.markdown(HEADER_HTML, unsafe_allow_html=True)
+st.markdown(MODEL_VIEWER_PRELOAD_HTML, unsafe_allow_html=True)
 
 # SIDEBAR CONFIGURATION
 # Initialize session state variables for file management and user interactions
@@ -103,75 +195,229 @@ def get_memory_service():
     except Exception as e:
         return None
 
-# Initialize memory service with error handling
-memory_service = get_memory_service()
-memory_available = memory_service is not None
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """
+    Create and cache a keep-alive HTTP session for requests to the execution server.
+    
+    Reusing one session keeps the connection to the server open between
+    generations instead of opening a new socket for every request. Failed
+    connection attempts are retried; a POST that reached the server is not,
+    so a generation is never started twice.
+    
+    Returns:
+        requests.Session with a pooled, retrying HTTP adapter
+    """
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.3)
+    ))
+    session.headers.update({"Connection": "keep-alive", "Content-Type": "application/json"})
+    return session
 
-if not memory_available:
-    st.sidebar.error("Memory service not available")
+@st.cache_resource(show_spinner=False)
+def get_generation_executor():
+    """
+    Create and cache the worker pool that sends generation requests.
+    
+    The pool outlives script reruns, so a generation keeps running while the
+    user interacts with the page.
+    
+    Returns:
+        ThreadPoolExecutor shared by all sessions
+    """
+    return ThreadPoolExecutor(max_workers=2)
+
+def generated_content_url(path):
+    """
+    Publish a generated file to Streamlit's static folder and return its URL.
+    
+    Streamlit serves ./static at /app/static (see .streamlit/config.toml), but only
+    files whose real path lies inside ./static, so a link to app/generated_content
+    would be refused. The file is hard-linked into static/generated_content instead
+    (copied where hard links are not possible), so the model viewer fetches it
+    directly instead of receiving it inlined into its HTML.
+    
+    Args:
+        path: Path of a file under app/generated_content
+    
+    Returns:
+        Root-relative URL of the file
+    """
+    relative_path = Path(os.path.relpath(path, "app/generated_content")).as_posix()
+    published = os.path.join("static", "generated_content", relative_path)
+    if not (os.path.exists(published) and os.path.samefile(published, path)):
+        os.makedirs(os.path.dirname(published), exist_ok=True)
+        # Built beside the target and renamed, so the server never sees a partial copy
+        staging = f"{published}.{os.getpid()}.tmp"
+        try:
+            os.link(path, staging)
+        except OSError:
+            shutil.copy2(path, staging)
+        os.replace(staging, published)
+    return f"/app/static/generated_content/{quote(relative_path)}"
 
 @st.cache_data(ttl=10, show_spinner=False)
-def get_cached_memory_stats():
+def path_exists(path):
+    """
+    Check whether a file exists, cached to skip repeated stat calls on reruns.
+    
+    The cache is cleared after a generation and when the selection is cleared;
+    the TTL covers files removed outside the app.
+    
+    Args:
+        path: File path to check
+    
+    Returns:
+        True if the path exists
+    """
+    return os.path.exists(path)
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def load_file_bytes(path, mtime, size):
+    """
+    Read a file once per version and keep its bytes in memory.
+    
+    A resource cache hands back the same bytes object on every rerun instead of
+    the copy a data cache would make.
+    
+    Args:
+        path: File path to read
+        mtime: Modification time of the file, part of the cache key
+        size: Size of the file in bytes, part of the cache key
+    
+    Returns:
+        Contents of the file
+    """
+    with open(path, "rb") as file:
+        return file.read()
+
+def read_file_bytes(path):
+    """
+    Return the contents of a file for a download button, cached per file version.
+    
+    Args:
+        path: File path to read
+    
+    Returns:
+        Contents of the file
+    """
+    file_stat = os.stat(path)
+    return load_file_bytes(path, file_stat.st_mtime, file_stat.st_size)
+
+@st.cache_data(show_spinner=False)
+def build_model_viewer_html(path, mtime, size, height):
     """
-    Retrieve memory statistics with caching for improved performance.
+    Build the <model-viewer> page for a GLB file, cached per file version.
+    
+    The file's mtime is appended to the model URL so the browser refetches a
+    model that was regenerated under the same name.
     
-    This function caches memory statistics for 10 seconds to reduce
-    database queries and improve UI responsiveness.
+    Args:
+        path: Path of a .glb file under app/generated_content
+        mtime: Modification time of the file, part of the cache key
+        size: Size of the file in bytes, part of the cache key
+        height: Height of the viewer in pixels
     
     Returns:
-        Dictionary containing memory statistics or default values
+        HTML document rendering the model
     """
-    if memory_available:
-        return memory_service.get_memory_stats()
-    return {'total_memories': 0}
+    model_url = f"{generated_content_url(path)}?v={int(mtime)}"
+    return MODEL_VIEWER_TEMPLATE.format(script=MODEL_VIEWER_SCRIPT, height=height, url=model_url)
+
+def parse_response(response):
+    """
+    Parse the execution server's response body into a dict.
+    
+    The server normally returns JSON but has been seen returning a Python dict
+    repr. ast.literal_eval builds a full parse tree, so it is only tried on bodies
+    up to LITERAL_EVAL_LIMIT characters.
+    
+    Args:
+        response: requests.Response from the execution endpoint
+    
+    Returns:
+        Parsed response dictionary
+    
+    Raises:
+        ValueError: If the body cannot be parsed
+    """
+    text = response.text
+    try:
+        return json.loads(text, strict=False)
+    except json.JSONDecodeError:
+        pass
+    # A single-quoted dict repr is usually valid JSON once the quotes are swapped
+    try:
+        return json.loads(text.replace("'", '"'), strict=False)
+    except json.JSONDecodeError:
+        pass
+    if len(text) < LITERAL_EVAL_LIMIT:
+        try:
+            return ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            pass
+    raise ValueError(f"Unreadable server response ({len(text)} characters)")
+
+# Initialize memory service with error handling
+memory_service = get_memory_service()
+memory_available = memory_service is not None
 
 @st.cache_data(ttl=10, show_spinner=False)
-def get_cached_recent_memories(limit=5):
+def get_cached_memory_bundle(limit=5):
     """
-    Retrieve recent memories with caching for improved performance.
+    Retrieve memory statistics and recent memories together, cached for 10 seconds.
+    
+    The sidebar and the example prompts both read from this one cache entry, so a
+    rerun costs at most one trip to the memory service.
     
     Args:
         limit: Maximum number of recent memories to retrieve
         
     Returns:
-        List of recent memory objects or empty list if unavailable
+        Tuple of (memory statistics dictionary, list of recent memory objects)
     """
-    if memory_available:
-        return memory_service.get_recent_memories(limit=limit)
-    return []
+    return memory_service.get_memory_stats(), memory_service.get_recent_memories(limit=limit)
 
 # MEMORY BROWSER SECTION
-# Display memory statistics and provide access to recent creations
-if memory_available:
+# Display memory statistics and provide access to recent creations. Without the
+# memory service there are no memories, which also turns off memory-aware examples.
+if not memory_available:
+    total_memories, recent_memories = 0, []
+    st.sidebar.error("Memory service not available")
+else:
     st.sidebar.markdown("---")
     st.sidebar.markdown("### Memory Browser")
     
     # Display memory statistics with caching for performance
-    memory_stats = get_cached_memory_stats()
+    memory_stats, recent_memories = get_cached_memory_bundle(5)
     total_memories = memory_stats.get('total_memories', 0)
     
     if total_memories > 0:
         st.sidebar.metric("Total Memories", total_memories)
         
-        # Display recent memories with interactive selection
-        recent_memories = get_cached_recent_memories(limit=5)
-        if recent_memories:
-            st.sidebar.markdown("**Recent Creations:**")
+        # Recent memories are only listed once the user asks to see them;
+        # a collapsed expander would still run its body on every rerun
+        if st.sidebar.toggle("🧠 Show recent creations", key="show_recent_memories"):
+            if recent_memories:
+                st.sidebar.markdown("**Recent Creations:**")
             
-            # Container for compact memory display
-            with st.sidebar.container():
-                for i, memory in enumerate(recent_memories, 1):
-                    prompt = memory['prompt']
-                    # Truncate long prompts for compact display
-                    display_prompt = prompt if len(prompt) <= 30 else prompt[:27] + "..."
+                # Container for compact memory display
+                with st.sidebar.container():
+                    for i, memory in enumerate(recent_memories, 1):
+                        prompt = memory['prompt']
+                        # Truncate long prompts for compact display
+                        display_prompt = prompt if len(prompt) <= 30 else prompt[:27] + "..."
                     
-                    # Interactive button for memory selection
-                    if st.sidebar.button(f'"{display_prompt}"', key=f"mem_{i}", help=f"Use: {prompt}"):
-                        st.session_state.current_prompt = prompt
-                        st.session_state.selected_prompt = prompt
-                        st.rerun()
-        else:
-            st.sidebar.write("No recent memories found.")
+                        # Interactive button for memory selection
+                        if st.sidebar.button(f'"{display_prompt}"', key=f"mem_{i}", help=f"Use: {prompt}"):
+                            st.session_state.current_prompt = prompt
+                            st.session_state.selected_prompt = prompt
+                            st.rerun()
+            else:
+                st.sidebar.write("No recent memories found.")
     else:
         st.sidebar.info("No memories stored yet\nCreate something to build your memory!")
 
@@ -188,44 +434,94 @@ if st.session_state.clear_selection_flag:
 else:
     browser_key = "file_browser"
 
+def generated_content_mtime():
+    """
+    Return the latest modification time of the generated content folders.
+    
+    New files land in per-day subfolders, which does not touch the root folder's
+    mtime, so the day folders are checked as well.
+    
+    Returns:
+        Latest mtime of app/generated_content and its direct subfolders
+    """
+    latest = os.stat("app/generated_content").st_mtime
+    with os.scandir("app/generated_content") as entries:
+        for entry in entries:
+            if entry.is_dir():
+                latest = max(latest, entry.stat().st_mtime)
+    return latest
+
+@st.cache_data(ttl=5, show_spinner=False)
+def count_generated_files(root_mtime):
+    """
+    Count generated images and 3D models, cached until the content folders change.
+    
+    Args:
+        root_mtime: Result of generated_content_mtime(), used as the cache key
+    
+    Returns:
+        Number of .png, .jpg, .jpeg and .glb files under app/generated_content
+    """
+    total = 0
+    stack = ["app/generated_content"]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stack.append(entry.path)
+                    continue
+                if entry.name.rpartition('.')[2].lower() not in GENERATED_EXTENSIONS:
+                    continue
+                total += 1
+    return total
+
 # File browser implementation with content filtering
 if os.path.exists("app/generated_content"):
-    with st.sidebar:
-        event = st_file_browser(
-            path="app/generated_content",
-            key=browser_key,
-            show_choose_file=True,
-            show_delete_file=False,
-            show_new_folder=False,
-            show_upload_file=False,
-            show_preview=False,
-            use_cache=False,
-            extentions=['.png', '.jpg', '.jpeg', '.glb'],
-            limit=50
-        )
+    # The browser enumerates the whole folder, so it is only mounted on request
+    if st.sidebar.toggle("📁 Browse files", key="show_file_browser"):
+        # The browser reads its listing from a tree cache file, which is rebuilt
+        # only when the content folders change instead of on every rerun
+        use_tree_cache = ensure_tree_cache is not None
+        if use_tree_cache:
+            signature = generated_content_mtime()
+            if st.session_state.get('file_browser_signature') != signature:
+                ensure_tree_cache("app/generated_content", limit=50, use_cache=True, force_rebuild=True)
+                # Writing the cache file the first time touches the folder itself
+                st.session_state.file_browser_signature = generated_content_mtime()
+        
+        with st.sidebar:
+            event = st_file_browser(
+                path="app/generated_content",
+                key=browser_key,
+                show_choose_file=True,
+                show_delete_file=False,
+                show_new_folder=False,
+                show_upload_file=False,
+                show_preview=False,
+                use_cache=use_tree_cache,
+                extentions=BROWSABLE_EXTENSIONS,
+                limit=50
+            )
     
-    # Handle file selection events with state management
-    if event and isinstance(event, dict) and event.get('type') == 'SELECT_FILE' and not st.session_state.clear_selection_flag:
-        target = event.get('target', {})
-        relative_path = target.get('path')
+        # Handle file selection events with state management
+        if event and isinstance(event, dict) and event.get('type') == 'SELECT_FILE' and not st.session_state.clear_selection_flag:
+            target = event.get('target', {})
+            relative_path = target.get('path')
         
-        if relative_path:
-            selected_path = os.path.join("app/generated_content", relative_path)
-            st.session_state.selected_file = {
-                'type': 'image' if selected_path.endswith(('.png', '.jpg', '.jpeg')) else '3d_model',
-                'path': selected_path,
-                'name': target.get('name', os.path.basename(selected_path)),
-                'date': 'recent'
-            }
-    
-    # Display file statistics for user awareness
-    total_files = 0
-    if os.path.exists("app/generated_content"):
-        for root, dirs, files in os.walk("app/generated_content"):
-            total_files += len([f for f in files if f.endswith(('.png', '.jpg', '.jpeg', '.glb'))])
-    
-    if total_files > 0:
-        st.sidebar.caption(f"Files available: {total_files}")
+            if relative_path:
+                selected_path = os.path.join("app/generated_content", relative_path)
+                st.session_state.selected_file = {
+                    'type': 'image' if selected_path.endswith(IMAGE_EXTENSIONS) else '3d_model',
+                    'path': selected_path,
+                    'name': target.get('name', os.path.basename(selected_path)),
+                    'date': 'recent'
+                }
+    
+        # Display file statistics for user awareness
+        total_files = count_generated_files(generated_content_mtime())
+    
+        if total_files > 0:
+            st.sidebar.caption(f"Files available: {total_files}")
     
     # Display selected file information with management options
     if st.session_state.selected_file:
@@ -238,6 +534,7 @@ if os.path.exists("app/generated_content"):
         if st.sidebar.button("Clear Selection", key="clear_selection_btn"):
             st.session_state.selected_file = None
             st.session_state.clear_selection_flag = True
+            path_exists.clear()
             st.rerun()
 else:
     st.sidebar.info("No generated files yet")
@@ -283,19 +580,16 @@ with col1:
     
     # Check if we have memories to suggest memory-aware examples
     memory_aware_examples = []
-    if memory_available and total_memories > 0:
-        # Get some recent memories for context-aware examples
-        recent_memories = memory_service.get_recent_memories(limit=3)
-        if recent_memories:
-            for memory in recent_memories:
-                prompt = memory['prompt']
-                if any(keyword in prompt.lower() for keyword in ['robot', 'dragon', 'city', 'crystal']):
-                    if 'robot' in prompt.lower():
-                        memory_aware_examples.append(f"Make a robot like the one I created before, but with wings")
-                    elif 'dragon' in prompt.lower():
-                        memory_aware_examples.append(f"Create a dragon similar to my last one, but this time in a forest")
-                    elif 'city' in prompt.lower():
-                        memory_aware_examples.append(f"Generate a city like my previous creation, but during sunrise")
+    if total_memories > 0:
+        # Reuse the sidebar's recent memories for context-aware examples
+        recent_memories_for_examples = recent_memories[:3]
+        if recent_memories_for_examples:
+            for memory in recent_memories_for_examples:
+                hit = set(re.findall(r"\w+", memory['prompt'].lower())) & MEMORY_EXAMPLE_KEYWORDS
+                if hit:
+                    example = next(MEMORY_EXAMPLES[keyword] for keyword in MEMORY_EXAMPLES if keyword in hit)
+                    if example:
+                        memory_aware_examples.append(example)
                     break
     
     # Combine regular and memory-aware examples
@@ -333,185 +627,107 @@ with col1:
     """)
 
 with col2:
-    # Generation logic - check this first to override everything else during generation
-    if submitted and st.session_state.current_prompt.strip():
+    # Generations run on a shared worker thread and are tracked in the session, so
+    # the page stays responsive and is polled with reruns until the response arrives
+    if submitted and st.session_state.current_prompt.strip() and 'generation' not in st.session_state:
         # Clear any selected file when starting new generation
         st.session_state.selected_file = None
         
+        payload = {"prompt": st.session_state.current_prompt.strip()}
+        st.session_state.generation = (
+            get_generation_executor().submit(
+                get_http_session().post,
+                "http://localhost:8888/execution",
+                json=payload,
+                timeout=120
+            ),
+            time.monotonic()
+        )
+    generation = st.session_state.get('generation')
+    
+    # Generation logic - check this first to override everything else during generation
+    if generation is not None and not generation[0].done():
         st.markdown("### 🔄 Generating...")
         
-        progress_bar = st.progress(0)
-        status_text = st.empty()
+        # The execution endpoint reports no progress itself, so the status follows
+        # the typical stage timings
+        elapsed = time.monotonic() - generation[1]
+        stage = next(stage for stage in reversed(GENERATION_STAGES) if elapsed >= stage[0])
+        st.progress(stage[1])
+        st.text(stage[2])
+    
+    elif generation is not None:
+        del st.session_state.generation
         
         try:
-            # Progressive status updates
-            status_text.text("🧠 Analyzing prompt...")
-            progress_bar.progress(15)
-            time.sleep(4)
-            
-            status_text.text("✨ Enhancing prompt with AI...")
-            progress_bar.progress(30)
-            time.sleep(4)
-            
-            status_text.text("🎨 Generating image...")
-            progress_bar.progress(50)
-            
-            payload = {"prompt": st.session_state.current_prompt.strip()}
-            response = requests.post(
-                "http://localhost:8888/execution",
-                headers={"Content-Type": "application/json"},
-                json=payload,
-                timeout=120
-            )
-            
-            status_text.text("🎭 Converting to 3D model...")
-            progress_bar.progress(85)
-            time.sleep(0.5)
+            response = generation[0].result()
+            # The pipeline has just written new files
+            path_exists.clear()
             
             if response.status_code == 200:
-                try:
-                    result = response.json()
-                except json.JSONDecodeError:
-                    result = ast.literal_eval(response.text)
-                
-                progress_bar.progress(100)
-                status_text.text("")
+                result = parse_response(response)
                 
                 message = result.get('message', '')
                 
                 if "Complete Success" in message or "Steps 1, 2 & 2.2 Complete" in message:
                     st.success("🎉 Generation successful!")
                     
-                    # Extract expanded prompt from the message - improved parsing
+                    # Extract every field from the message in a single pass
                     expanded_prompt = None
-                    lines = message.split('\n')
+                    memory_reference_info = None
+                    memory_count = None
+                    memory_lines = []
+                    image_file = None
+                    model_file = None
+                    image_path_match = None
+                    model_path_match = None
                     
-                    # Look for the enhanced prompt between specific markers
-                    if "✨ Expanded Prompt:" in message and "🧠 LLM Analysis:" in message:
-                        start_marker = "✨ Expanded Prompt:"
-                        end_marker = "🧠 LLM Analysis:"
-                        
-                        start_idx = message.find(start_marker)
-                        end_idx = message.find(end_marker)
-                        
-                        if start_idx != -1 and end_idx != -1:
-                            # Extract text between markers
-                            prompt_section = message[start_idx + len(start_marker):end_idx].strip()
-                            
-                            # Remove the <think> section if present
-                            if "<think>" in prompt_section:
-                                think_start = prompt_section.find("<think>")
-                                think_end = prompt_section.find("</think>")
-                                if think_start != -1 and think_end != -1:
-                                    # Get text after </think>
-                                    expanded_prompt = prompt_section[think_end + 8:].strip()
+                    for match in MESSAGE_FIELDS.finditer(message):
+                        kind = match.lastgroup
+                        value = match.group(kind).strip()
+                        if kind == 'expanded':
+                            # Drop the model's <think> section if present
+                            expanded_prompt = THINK_BLOCK.sub("", value).strip() or None
+                        elif kind == 'reference' and memory_reference_info is None:
+                            memory_reference_info = value
+                        elif kind == 'count' and memory_count is None:
+                            memory_count = value
+                        elif kind == 'listed' and memory_count is not None:
+                            memory_lines.append(value)
+                        elif kind == 'image':
+                            image_file = value
+                        elif kind == 'model':
+                            model_file = value
+                        elif kind == 'path':
+                            # Alternative parsing for file paths mentioned elsewhere
+                            if value.endswith(MODEL_EXTENSIONS):
+                                model_path_match = model_path_match or value
                             else:
-                                expanded_prompt = prompt_section
+                                image_path_match = image_path_match or value
                     
-                    # Fallback to original parsing if the new method doesn't work
-                    if not expanded_prompt:
-                        # Look for the enhanced prompt more broadly
-                        for i, line in enumerate(lines):
-                            line_lower = line.lower()
-                            if any(keyword in line_lower for keyword in ["enhanced prompt:", "expanded prompt:", "improved prompt:"]):
-                                # Try to get the prompt from the same line first
-                                if ":" in line:
-                                    prompt_part = line.split(":", 1)[-1].strip()
-                                    if prompt_part and not prompt_part.startswith("Step"):
-                                        expanded_prompt = prompt_part
-                                        break
-                                # If not found on same line, check next line
-                                elif i + 1 < len(lines):
-                                    next_line = lines[i + 1].strip()
-                                    if next_line and not next_line.startswith("Step") and not next_line.startswith("Image"):
-                                        expanded_prompt = next_line
-                                        break
-                            elif "step 1 complete" in line_lower and i + 1 < len(lines):
-                                # Sometimes the enhanced prompt follows "Step 1 Complete"
-                                next_line = lines[i + 1].strip()
-                                if next_line and not next_line.startswith("Step") and not next_line.startswith("Image") and len(next_line) > 20:
-                                    expanded_prompt = next_line
-                                    break
+                    image_file = image_file or image_path_match
+                    model_file = model_file or model_path_match
                     
                     # Show expanded prompt if found
                     if expanded_prompt:
                         with st.expander("🧠 AI Enhanced Prompt", expanded=False):
                             st.info(expanded_prompt)
                     
-                    # Extract and show memory information
-                    memory_info = None
-                    memory_reference_info = None
-                    
-                    # Check for memory reference detection
-                    if "Memory Reference Detected:" in message:
-                        lines = message.split('\n')
-                        for line in lines:
-                            if "Memory Reference Detected:" in line:
-                                memory_reference_info = line.split("Memory Reference Detected:")[-1].strip()
-                                break
-                    
-                    # Check for similar past creations
-                    if "Similar past creations found:" in message:
-                        lines = message.split('\n')
-                        for i, line in enumerate(lines):
-                            if "Similar past creations found:" in line:
-                                # Extract the number
-                                memory_count = line.split(":")[-1].strip().split()[0]
-                                memory_info = f"Found {memory_count} memories related to your prompt"
-                                break
-                    
                     # Display memory information
                     if memory_reference_info:
                         st.info(f"🔍 {memory_reference_info}")
                     
-                    if memory_info:
-                        st.info(f"💭 {memory_info}")
+                    if memory_count:
+                        st.info(f"💭 Found {memory_count} memories related to your prompt")
                         
                         # Show memory connections if available
-                        if "matches" in message:
+                        if memory_lines:
                             with st.expander("🧠 Similar Past Creations", expanded=False):
-                                lines = message.split('\n')
-                                in_memory_section = False
-                                memory_lines = []
-                                
-                                for line in lines:
-                                    if "Similar past creations found:" in line:
-                                        in_memory_section = True
-                                        continue
-                                    elif in_memory_section and line.strip().startswith(('1.', '2.', '3.', '4.', '5.')):
-                                        memory_lines.append(line.strip())
-                                    elif in_memory_section and not line.strip().startswith(' ') and line.strip():
-                                        break
-                                
-                                if memory_lines:
-                                    for memory_line in memory_lines:
-                                        st.write(f"📝 {memory_line}")
+                                for memory_line in memory_lines:
+                                    st.write(f"📝 {memory_line}")
                     
-                    # Extract file names - improved parsing
-                    image_file = None
-                    model_file = None
-                    
-                    for line in lines:
-                        if "Image saved as:" in line:
-                            image_file = line.split("Image saved as:")[-1].strip()
-                        elif "3D model saved as:" in line:
-                            model_file = line.split("3D model saved as:")[-1].strip()
-                        elif "generated_content/" in line and (".png" in line or ".jpg" in line):
-                            # Alternative parsing for image files
-                            if not image_file:
-                                parts = line.split()
-                                for part in parts:
-                                    if "generated_content/" in part and (".png" in part or ".jpg" in part):
-                                        image_file = part
-                                        break
-                        elif "generated_content/" in line and (".glb" in line or ".obj" in line):
-                            # Alternative parsing for model files
-                            if not model_file:
-                                parts = line.split()
-                                for part in parts:
-                                    if "generated_content/" in part and (".glb" in part or ".obj" in part):
-                                        model_file = part
-                                        break
+                    # Day folder the pipeline saves into, for bare file names in the message
+                    today = datetime.now().strftime("%Y-%m-%d")
                     
                     # Display results
                     tab1, tab2 = st.tabs(["🖼️ Image", "🎭 3D Model"])
@@ -522,20 +738,18 @@ with col2:
                                 image_path = f"app/{image_file}"
                             else:
                                 image_path = f"app/{image_file}"
-                                today = datetime.now().strftime("%Y-%m-%d")
                                 new_path = f"app/generated_content/{today}/{image_file}"
-                                if os.path.exists(new_path):
+                                if path_exists(new_path):
                                     image_path = new_path
                             
-                            if os.path.exists(image_path):
+                            if path_exists(image_path):
                                 st.image(image_path, use_container_width=True)
-                                with open(image_path, "rb") as file:
-                                    st.download_button(
-                                        label="📥 Download Image",
-                                        data=file.read(),
-                                        file_name=os.path.basename(image_file),
-                                        mime="image/png"
-                                    )
+                                st.download_button(
+                                    label="📥 Download Image",
+                                    data=read_file_bytes(image_path),
+                                    file_name=os.path.basename(image_file),
+                                    mime="image/png"
+                                )
                             else:
                                 st.error("Image not found")
                         else:
@@ -558,9 +772,8 @@ with col2:
                                 model_path = f"app/{model_file}"
                             else:
                                 model_path = f"app/{model_file}"
-                                today = datetime.now().strftime("%Y-%m-%d")
                                 new_path = f"app/generated_content/{today}/{model_file}"
-                                if os.path.exists(new_path):
+                                if path_exists(new_path):
                                     model_path = new_path
                             
                             if model_file.endswith('.glb'):
@@ -568,47 +781,18 @@ with col2:
                             else:
                                 glb_path = model_path.replace('.obj', '.glb')
                             
-                            if os.path.exists(glb_path):
+                            if path_exists(glb_path):
                                 try:
-                                    with open(glb_path, 'rb') as f:
-                                        model_data = f.read()
-                                    model_base64 = base64.b64encode(model_data).decode()
-                                    
-                                    model_viewer_html = f"""
-                                    <!DOCTYPE html>
-                                    <html>
-                                    <head>
-                                        <script type="module" src="https://ajax.googleapis.com/ajax/libs/model-viewer/3.3.0/model-viewer.min.js"></script>
-                                        <style>
-                                            model-viewer {{
-                                                width: 100%;
-                                                height: 400px;
-                                                background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-                                                border-radius: 8px;
-                                            }}
-                                        </style>
-                                    </head>
-                                    <body>
-                                        <model-viewer
-                                            src="data:model/gltf-binary;base64,{model_base64}"
-                                            alt="3D Model"
-                                            auto-rotate
-                                            camera-controls
-                                            loading="eager">
-                                        </model-viewer>
-                                    </body>
-                                    </html>
-                                    """
-                                    
+                                    model_stat = os.stat(glb_path)
+                                    model_viewer_html = build_model_viewer_html(glb_path, model_stat.st_mtime, model_stat.st_size, 400)
                                     components.html(model_viewer_html, height=420)
                                     
-                                    with open(glb_path, "rb") as file:
-                                        st.download_button(
-                                            label="📥 Download 3D Model",
-                                            data=file.read(),
-                                            file_name=os.path.basename(glb_path),
-                                            mime="model/gltf-binary"
-                                        )
+                                    st.download_button(
+                                        label="📥 Download 3D Model",
+                                        data=read_file_bytes(glb_path),
+                                        file_name=os.path.basename(glb_path),
+                                        mime="model/gltf-binary"
+                                    )
                                         
                                 except Exception as e:
                                     st.error("Error loading 3D model")
@@ -638,64 +822,34 @@ with col2:
         st.markdown(f"### {selected['name']}")
         
         if selected['type'] == 'image':
-            if os.path.exists(selected['path']):
+            if path_exists(selected['path']):
                 st.image(selected['path'], caption=selected['name'], use_container_width=True)
                 
-                with open(selected['path'], "rb") as file:
-                    st.download_button(
-                        label="📥 Download",
-                        data=file.read(),
-                        file_name=selected['name'],
-                        mime="image/png",
-                        use_container_width=True
-                    )
+                st.download_button(
+                    label="📥 Download",
+                    data=read_file_bytes(selected['path']),
+                    file_name=selected['name'],
+                    mime="image/png",
+                    use_container_width=True
+                )
             else:
                 st.error("Image not found")
         
         elif selected['type'] == '3d_model':
-            if os.path.exists(selected['path']) and selected['name'].endswith('.glb'):
+            if path_exists(selected['path']) and selected['name'].endswith('.glb'):
                 try:
-                    with open(selected['path'], 'rb') as f:
-                        model_data = f.read()
-                    model_base64 = base64.b64encode(model_data).decode()
-                    
                     # Clean 3D viewer
-                    model_viewer_html = f"""
-                    <!DOCTYPE html>
-                    <html>
-                    <head>
-                        <script type="module" src="https://ajax.googleapis.com/ajax/libs/model-viewer/3.3.0/model-viewer.min.js"></script>
-                        <style>
-                            model-viewer {{
-                                width: 100%;
-                                height: 500px;
-                                background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-                                border-radius: 8px;
-                            }}
-                        </style>
-                    </head>
-                    <body>
-                        <model-viewer
-                            src="data:model/gltf-binary;base64,{model_base64}"
-                            alt="3D Model"
-                            auto-rotate
-                            camera-controls
-                            loading="eager">
-                        </model-viewer>
-                    </body>
-                    </html>
-                    """
-                    
+                    model_stat = os.stat(selected['path'])
+                    model_viewer_html = build_model_viewer_html(selected['path'], model_stat.st_mtime, model_stat.st_size, 500)
                     components.html(model_viewer_html, height=520)
                     
-                    with open(selected['path'], "rb") as file:
-                        st.download_button(
-                            label="📥 Download",
-                            data=file.read(),
-                            file_name=selected['name'],
-                            mime="model/gltf-binary",
-                            use_container_width=True
-                        )
+                    st.download_button(
+                        label="📥 Download",
+                        data=read_file_bytes(selected['path']),
+                        file_name=selected['name'],
+                        mime="model/gltf-binary",
+                        use_container_width=True
+                    )
                         
                 except Exception as e:
                     st.error("Error loading 3D model")
@@ -713,3 +867,7 @@ with col2:
         Your creations will appear here and be saved in the sidebar for future viewing.
         """)
 
+# Poll a running generation; widget interactions still rerun the page meanwhile
+if 'generation' in st.session_state:
+    time.sleep(0.25)
+    st.rerun()
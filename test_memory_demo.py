@@ -6,10 +6,24 @@ This script demonstrates how the memory system works for the AI Creative Pipelin
 
 import sys
 import os
+import io
+from contextlib import contextmanager, redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
 sys.path.append('app')
 
 from core.memory_service import MemoryService
-from core.llm_service import LocalLLMService
+from core.llm_service import get_llm_service
+
+@contextmanager
+def buffered_output():
+    """Collect a section's prints and write them to stdout in one call."""
+    buffer = io.StringIO()
+    try:
+        with redirect_stdout(buffer):
+            yield
+    finally:
+        sys.stdout.write(buffer.getvalue())
+        sys.stdout.flush()
 
 def main():
     print("🧠 AI Memory System Demo")
@@ -17,18 +31,21 @@ def main():
     
     # Initialize services
     memory_service = MemoryService(persist_directory="app/datastore/memory")
-    llm_service = LocalLLMService()
+    # Near-duplicate prompts reuse earlier LLM answers through the semantic cache.
+    # It embeds through the memory service's caches, which load the encoder on first use.
+    llm_service = get_llm_service(embedder=memory_service.embed_query)
     
     # Get current memory stats
-    stats = memory_service.get_memory_stats()
-    print(f"📊 Current memory stats:")
-    print(f"   Total memories: {stats['total_memories']}")
-    print(f"   Unique tags: {stats['unique_tags']}")
+    with buffered_output():
+        stats = memory_service.get_memory_stats()
+        print(f"📊 Current memory stats:")
+        print(f"   Total memories: {stats['total_memories']}")
+        print(f"   Unique tags: {stats['unique_tags']}")
     
-    if stats['top_tags']:
-        print(f"   Top tags: {', '.join([f'{tag}({count})' for tag, count in stats['top_tags'][:5]])}")
+        if stats['top_tags']:
+            print(f"   Top tags: {', '.join([f'{tag}({count})' for tag, count in stats['top_tags'][:5]])}")
     
-    print("\n" + "=" * 50)
+        print("\n" + "=" * 50)
     
     # Test memory-aware prompts
     test_prompts = [
@@ -39,41 +56,6 @@ def main():
         "A magical forest with floating gems"
     ]
     
-    print("🔍 Testing Memory-Aware Prompt Processing:")
-    print("-" * 40)
-    
-    for prompt in test_prompts:
-        print(f"\n🎯 Testing prompt: \"{prompt}\"")
-        
-        # Step 1: Detect memory references
-        memory_ref = llm_service.detect_memory_reference(prompt)
-        print(f"   🔍 Memory reference detected: {memory_ref['has_memory_reference']}")
-        print(f"   🎯 Confidence: {memory_ref['confidence']}")
-        if memory_ref.get('explanation'):
-            print(f"   💭 LLM reasoning: {memory_ref['explanation']}")
-        if memory_ref.get('reference_type') and memory_ref['reference_type'] != 'none':
-            print(f"   🏷️ Reference type: {memory_ref['reference_type']}")
-        
-        # Step 2: Search for similar memories
-        similar_memories = memory_service.search_memories(prompt, limit=3)
-        print(f"   📚 Similar memories found: {len(similar_memories)}")
-        
-        for i, memory in enumerate(similar_memories, 1):
-            similarity = memory.get('similarity', 0)
-            print(f"      {i}. \"{memory['prompt'][:50]}...\" ({similarity:.1%} similar)")
-        
-        # Step 3: Show what memory-aware processing would do
-        if similar_memories:
-            print(f"   🧠 Would use MEMORY-AWARE processing (found {len(similar_memories)} similar memories)")
-        elif memory_ref['has_memory_reference']:
-            print(f"   🧠 Would use MEMORY-AWARE processing (detected memory reference)")
-        else:
-            print(f"   🤖 Would use STANDARD processing (no memory context)")
-    
-    print("\n" + "=" * 50)
-    print("🎯 Memory Search Demo:")
-    print("-" * 30)
-    
     # Test semantic search
     search_queries = [
         "robot",
@@ -83,23 +65,66 @@ def main():
         "steampunk"
     ]
     
-    for query in search_queries:
-        results = memory_service.search_memories(query, limit=2)
-        print(f"\n🔍 Search: \"{query}\" → {len(results)} results")
-        for i, result in enumerate(results, 1):
-            similarity = result.get('similarity', 0)
-            prompt = result['prompt']
-            tags = result.get('tags', [])
-            print(f"   {i}. \"{prompt[:40]}...\" ({similarity:.1%})")
-            if tags:
-                print(f"      Tags: {', '.join(tags[:5])}")
+    # Run every search of the demo as one batch: one encoder call and one index pass.
+    # The LLM memory-reference checks wait on Ollama, so they run concurrently with it.
+    with ThreadPoolExecutor(max_workers=len(test_prompts) + 1) as executor:
+        search_future = executor.submit(memory_service.search_memories_batch, test_prompts + search_queries, 3)
+        memory_refs = list(executor.map(llm_service.detect_memory_reference, test_prompts))
+        all_results = search_future.result()
+    prompt_results = all_results[:len(test_prompts)]
+    query_results = all_results[len(test_prompts):]
+    
+    with buffered_output():
+        print("🔍 Testing Memory-Aware Prompt Processing:")
+        print("-" * 40)
+    
+        for prompt, memory_ref, similar_memories in zip(test_prompts, memory_refs, prompt_results):
+            print(f"\n🎯 Testing prompt: \"{prompt}\"")
+        
+            # Step 1: Detect memory references
+            print(f"   🔍 Memory reference detected: {memory_ref['has_memory_reference']}")
+            print(f"   🎯 Confidence: {memory_ref['confidence']}")
+            if memory_ref.get('explanation'):
+                print(f"   💭 LLM reasoning: {memory_ref['explanation']}")
+            if memory_ref.get('reference_type') and memory_ref['reference_type'] != 'none':
+                print(f"   🏷️ Reference type: {memory_ref['reference_type']}")
+        
+            # Step 2: Search for similar memories
+            print(f"   📚 Similar memories found: {len(similar_memories)}")
+        
+            for i, memory in enumerate(similar_memories, 1):
+                similarity = memory.get('similarity', 0)
+                print(f"      {i}. \"{memory['prompt'][:50]}...\" ({similarity:.1%} similar)")
+        
+            # Step 3: Show what memory-aware processing would do
+            if similar_memories:
+                print(f"   🧠 Would use MEMORY-AWARE processing (found {len(similar_memories)} similar memories)")
+            elif memory_ref['has_memory_reference']:
+                print(f"   🧠 Would use MEMORY-AWARE processing (detected memory reference)")
+            else:
+                print(f"   🤖 Would use STANDARD processing (no memory context)")
+    
+        print("\n" + "=" * 50)
+        print("🎯 Memory Search Demo:")
+        print("-" * 30)
+    
+        for query, results in zip(search_queries, query_results):
+            results = results[:2]
+            print(f"\n🔍 Search: \"{query}\" → {len(results)} results")
+            for i, result in enumerate(results, 1):
+                similarity = result.get('similarity', 0)
+                prompt = result['prompt']
+                tags = result.get('tags', [])
+                print(f"   {i}. \"{prompt[:40]}...\" ({similarity:.1%})")
+                if tags:
+                    print(f"      Tags: {', '.join(tags[:5])}")
     
-    print("\n" + "=" * 50)
-    print("✅ Memory System Demo Complete!")
-    print(f"💡 Your AI system has {stats['total_memories']} memories stored")
-    print("💡 It can detect memory references in user prompts")
-    print("💡 It provides context-aware generation based on past creations")
-    print("💡 Users can search and recall past creations semantically")
+        print("\n" + "=" * 50)
+        print("✅ Memory System Demo Complete!")
+        print(f"💡 Your AI system has {stats['total_memories']} memories stored")
+        print("💡 It can detect memory references in user prompts")
+        print("💡 It provides context-aware generation based on past creations")
+        print("💡 Users can search and recall past creations semantically")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file